@@ -14,15 +14,33 @@ class Settings(BaseSettings):
     # OpenAI
     openai_api_key: str
     openai_model: str = "gpt-4o-mini-2024-07-18"
+    openai_max_connections: int = 64
+    openai_max_keepalive_connections: int = 32
+    openai_max_retries: int = 3
+    openai_timeout_seconds: float = 60.0
     
     # Supabase
     supabase_url: str
     supabase_key: str
+    supabase_max_connections: int = 20
+    supabase_max_keepalive_connections: int = 10
+    supabase_timeout_seconds: float = 30.0
+    supabase_connect_retries: int = 2
     
     # Bot behavior
     buffer_window_minutes: int = 60
     min_messages_for_summary: int = 8
     max_suggestions_per_day: int = 3
+    listening_cache_ttl_seconds: int = 60
+    slack_handler_concurrency: int = 64
+    pipeline_concurrency: int = 4
+    summary_batch_size: int = 4
+    summary_batch_max_tokens: int = 2000
+    summary_token_budget: int = 6000
+    
+    # Message ingestion (batched inserts)
+    message_batch_size: int = 50
+    message_batch_interval_ms: int = 200
     
     # Target founder
     founder_user_id: str
@@ -32,6 +50,6 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
 
 
-@lru_cache
+@lru_cache(maxsize=None)
 def get_settings() -> Settings:
     return Settings()
@@ -1,10 +1,19 @@
 """
 Supabase database client and operations for Chorus bot.
+All queries are async so callers never block the event loop.
 """
-from supabase import create_client, Client
-from datetime import datetime, timedelta
+from supabase import AsyncClient, AsyncClientOptions
+from postgrest import ReturnMethod
+from datetime import datetime, timezone
+from itertools import groupby
+from operator import itemgetter
 from typing import Optional
+import asyncio
+import httpx
 import json
+import logging
+import time
+import uuid
 
 from app.config import get_settings
 from app.models import (
@@ -15,89 +24,344 @@ from app.models import (
     ListeningChannel
 )
 
+logger = logging.getLogger(__name__)
+
+# Column projections, so reads only transfer what callers use
+_MESSAGE_COLUMNS = "id,channel_id,user_id,text,created_at"
+_SUMMARY_COLUMNS = "id,channel_id,summary,created_at"
+_SUMMARY_COLUMNS_WITH_METADATA = _SUMMARY_COLUMNS + ",metadata"
+_SUGGESTION_COLUMNS = "id,summary_id,insight,linkedin_draft,x_draft,status,created_at"
+
+# Suggestion fields written on insert (id/created_at come from the DB)
+_SUGGESTION_WRITE_FIELDS = {
+    "summary_id", "insight", "linkedin_draft", "x_draft", "status", "fingerprint"
+}
+
 
 class Database:
     """Database operations using Supabase."""
     
     def __init__(self):
         settings = get_settings()
-        self.client: Client = create_client(
+        
+        # Long-lived pooled async HTTP client shared by every request.
+        # Transport retries re-establish dropped connections.
+        self._http = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=settings.supabase_max_connections,
+                    max_keepalive_connections=settings.supabase_max_keepalive_connections,
+                    keepalive_expiry=40
+                ),
+                retries=settings.supabase_connect_retries
+            ),
+            timeout=httpx.Timeout(settings.supabase_timeout_seconds)
+        )
+        self.client: AsyncClient = AsyncClient(
             settings.supabase_url, 
-            settings.supabase_key
+            settings.supabase_key,
+            options=AsyncClientOptions(httpx_client=self._http)
         )
+        self._batch_size = settings.message_batch_size
+        self._batch_interval = settings.message_batch_interval_ms / 1000
+        
+        # Pending message inserts, flushed in batches by the writer task
+        self._message_queue: asyncio.Queue = asyncio.Queue()
+        self._pending_inserts: dict[str, asyncio.Future] = {}
+        self._writer_task: Optional[asyncio.Task] = None
+        
+        # Listening channels cache: (fetched_at monotonic, channel IDs).
+        # A frozenset is built once per refresh so membership checks on
+        # the message hot path are O(1) with no per-call allocation.
+        self._channels_cache: tuple[float, frozenset[str]] = (float("-inf"), frozenset())
+        self._channels_cache_ttl = settings.listening_cache_ttl_seconds
     
     # ========================================================
     # Messages
     # ========================================================
     
-    def save_message(self, message: SlackMessage) -> dict:
-        """Save a message to the database."""
-        data = {
+    @staticmethod
+    def _message_row(message: SlackMessage) -> dict:
+        """Convert a message to its database row."""
+        return {
             "channel_id": message.channel_id,
+            "slack_ts": message.message_id,
             "user_id": message.user_id,
             "text": message.text,
             "created_at": message.timestamp.isoformat()
         }
-        result = self.client.table("messages").insert(data).execute()
+    
+    async def save_message(self, message: SlackMessage) -> dict:
+        """
+        Save a message to the database.
+        
+        Redelivered Slack events (same channel and ts) are ignored.
+        """
+        data = self._message_row(message)
+        result = await self.client.table("messages") \
+            .upsert(data, on_conflict="channel_id,slack_ts", ignore_duplicates=True) \
+            .execute()
         return result.data[0] if result.data else {}
     
-    def get_messages_in_window(
+    async def save_messages_batch(
+        self, 
+        messages: list[SlackMessage], 
+        return_rows: bool = True
+    ) -> list[dict]:
+        """
+        Save multiple messages with a single insert.
+        
+        Returns only the rows actually inserted; duplicates are skipped.
+        With return_rows=False the DB sends nothing back and [] is returned.
+        """
+        if not messages:
+            return []
+        
+        rows = [self._message_row(message) for message in messages]
+        returning = ReturnMethod.representation if return_rows else ReturnMethod.minimal
+        result = await self.client.table("messages") \
+            .upsert(
+                rows, 
+                on_conflict="channel_id,slack_ts", 
+                ignore_duplicates=True, 
+                returning=returning
+            ) \
+            .execute()
+        return result.data or []
+    
+    def enqueue_message(
+        self, 
+        message: SlackMessage, 
+        track: bool = False
+    ) -> Optional[asyncio.Future]:
+        """
+        Queue a message for the next batched insert.
+        
+        With track=True, returns a future resolving to the inserted row.
+        Untracked messages skip the future bookkeeping, and a batch with
+        no tracked messages is inserted without returning rows.
+        """
+        self.start_message_writer()
+        
+        if not track:
+            self._message_queue.put_nowait((None, message))
+            return None
+        
+        request_id = str(uuid.uuid4())
+        future = asyncio.get_running_loop().create_future()
+        self._pending_inserts[request_id] = future
+        self._message_queue.put_nowait((request_id, message))
+        return future
+    
+    def start_message_writer(self) -> None:
+        """Start the background task that flushes queued messages."""
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._message_writer_loop())
+    
+    async def stop_message_writer(self) -> None:
+        """Flush any queued messages and stop the writer task."""
+        if self._writer_task is None:
+            return
+        
+        await self._message_queue.join()
+        self._writer_task.cancel()
+        try:
+            await self._writer_task
+        except asyncio.CancelledError:
+            pass
+        self._writer_task = None
+    
+    async def close(self) -> None:
+        """Flush queued writes and release pooled connections."""
+        await self.stop_message_writer()
+        await self._http.aclose()
+    
+    async def _message_writer_loop(self) -> None:
+        """Drain the queue in batches of up to N messages or T ms."""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._message_queue.get()]
+            deadline = loop.time() + self._batch_interval
+            
+            while len(batch) < self._batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._message_queue.get(), timeout)
+                    )
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await self._flush_messages(batch)
+            finally:
+                for _ in batch:
+                    self._message_queue.task_done()
+    
+    async def _flush_messages(
+        self, 
+        batch: list[tuple[Optional[str], SlackMessage]]
+    ) -> None:
+        """
+        Insert a batch of queued messages and resolve their futures.
+        
+        Futures for duplicates (or a failed insert) resolve to {}.
+        """
+        tracked = any(request_id for request_id, _ in batch)
+        try:
+            rows = await self.save_messages_batch(
+                [message for _, message in batch], 
+                return_rows=tracked
+            )
+        except Exception as e:
+            logger.error(f"Failed to save batch of {len(batch)} message(s): {e}")
+            rows = []
+        
+        # Duplicates aren't returned, so match rows back by Slack identity
+        inserted = {(row["channel_id"], row["slack_ts"]): row for row in rows}
+        
+        for request_id, message in batch:
+            if request_id is None:
+                continue
+            future = self._pending_inserts.pop(request_id, None)
+            if future and not future.done():
+                future.set_result(
+                    inserted.get((message.channel_id, message.message_id), {})
+                )
+    
+    async def get_messages_in_window(
         self, 
         channel_id: str, 
-        window_minutes: int = 60
+        window_minutes: int = 60,
+        limit: int = 500
     ) -> list[SlackMessage]:
-        """Get messages from the last N minutes."""
-        cutoff = datetime.utcnow() - timedelta(minutes=window_minutes)
+        """
+        Get messages from the last N minutes, oldest first.
         
-        result = self.client.table("messages") \
-            .select("*") \
-            .eq("channel_id", channel_id) \
-            .gte("created_at", cutoff.isoformat()) \
-            .order("created_at", desc=False) \
-            .execute()
+        Returns at most the newest `limit` messages. The cutoff is computed
+        server-side by the get_messages_window() RPC using now(), so app
+        clock skew doesn't shift the window. Messages at or before the
+        channel's last_summarized_at mark are left out, so a run never
+        re-summarizes them.
+        """
+        result = await self.client.rpc(
+            "get_messages_window",
+            {"channel_id": channel_id, "minutes": window_minutes, "max_rows": limit}
+        ).select(_MESSAGE_COLUMNS).execute()
         
-        messages = []
-        for row in result.data:
-            messages.append(SlackMessage(
+        # Rows come from our own table, so skip Pydantic validation
+        fromiso = datetime.fromisoformat
+        construct = SlackMessage.model_construct
+        return [
+            construct(
                 message_id=row["id"],
                 channel_id=row["channel_id"],
                 user_id=row["user_id"],
                 text=row["text"],
-                timestamp=datetime.fromisoformat(row["created_at"].replace("Z", "+00:00"))
-            ))
-        return messages
+                timestamp=fromiso(row["created_at"])
+            )
+            for row in result.data
+        ]
     
-    def get_unprocessed_messages(
+    async def count_messages_in_window(
+        self, 
+        channel_id: str, 
+        window_minutes: int = 60
+    ) -> int:
+        """Count unsummarized messages from the last N minutes without fetching rows."""
+        result = await self.client.rpc(
+            "count_messages_window",
+            {"channel_id": channel_id, "minutes": window_minutes}
+        ).execute()
+        return result.data or 0
+    
+    async def get_ready_buffers(
+        self, 
+        min_messages: int, 
+        window_minutes: int = 60,
+        limit: int = 500
+    ) -> dict[str, list[SlackMessage]]:
+        """
+        Get windowed buffers for all listening channels in one query.
+        
+        Channels with fewer than min_messages are dropped server-side by
+        the get_ready_buffers() RPC, and each channel returns at most its
+        newest `limit` messages, oldest first. Only messages after the
+        channel's last_summarized_at mark count or are returned.
+        """
+        result = await self.client.rpc(
+            "get_ready_buffers",
+            {
+                "min_messages": min_messages, 
+                "window_minutes": window_minutes, 
+                "max_rows": limit
+            }
+        ).select(_MESSAGE_COLUMNS).execute()
+        
+        # Rows arrive ordered by channel, so group them in one pass
+        fromiso = datetime.fromisoformat
+        construct = SlackMessage.model_construct
+        return {
+            channel_id: [
+                construct(
+                    message_id=row["id"],
+                    channel_id=row["channel_id"],
+                    user_id=row["user_id"],
+                    text=row["text"],
+                    timestamp=fromiso(row["created_at"])
+                )
+                for row in rows
+            ]
+            for channel_id, rows in groupby(result.data, key=itemgetter("channel_id"))
+        }
+    
+    async def get_unprocessed_messages(
         self, 
         channel_id: str, 
         since: Optional[datetime] = None
     ) -> list[SlackMessage]:
-        """Get messages that haven't been summarized yet."""
-        query = self.client.table("messages") \
-            .select("*") \
-            .eq("channel_id", channel_id)
+        """
+        Get messages that haven't been summarized yet.
         
+        Without `since`, the get_new_messages() RPC starts from the
+        channel's last_summarized_at mark, which a trigger advances
+        whenever a summary is saved.
+        """
         if since:
-            query = query.gte("created_at", since.isoformat())
-        
-        result = query.order("created_at", desc=False).execute()
+            result = await self.client.table("messages") \
+                .select(_MESSAGE_COLUMNS) \
+                .eq("channel_id", channel_id) \
+                .gte("created_at", since.isoformat()) \
+                .order("created_at", desc=False) \
+                .execute()
+        else:
+            result = await self.client.rpc(
+                "get_new_messages", 
+                {"channel_id": channel_id}
+            ).select(_MESSAGE_COLUMNS).execute()
         
-        messages = []
-        for row in result.data:
-            messages.append(SlackMessage(
+        # Rows come from our own table, so skip Pydantic validation
+        fromiso = datetime.fromisoformat
+        construct = SlackMessage.model_construct
+        return [
+            construct(
                 message_id=row["id"],
                 channel_id=row["channel_id"],
                 user_id=row["user_id"],
                 text=row["text"],
-                timestamp=datetime.fromisoformat(row["created_at"].replace("Z", "+00:00"))
-            ))
-        return messages
+                timestamp=fromiso(row["created_at"])
+            )
+            for row in result.data
+        ]
     
     # ========================================================
     # Summaries
     # ========================================================
     
-    def save_summary(
+    async def save_summary(
         self, 
         channel_id: str, 
         summary: str, 
@@ -107,23 +371,16 @@ class Database:
         data = {
             "channel_id": channel_id,
             "summary": summary,
-            "metadata": {
-                "key_ideas": metadata.key_ideas,
-                "opinions": metadata.opinions,
-                "decisions": metadata.decisions,
-                "interesting_phrases": metadata.interesting_phrases,
-                "message_count": metadata.message_count,
-                "window_start": metadata.window_start.isoformat(),
-                "window_end": metadata.window_end.isoformat()
-            }
+            # pydantic-core serializes lists and datetimes natively
+            "metadata": metadata.model_dump(mode="json")
         }
-        result = self.client.table("summaries").insert(data).execute()
+        result = await self.client.table("summaries").insert(data).execute()
         return result.data[0] if result.data else {}
     
-    def get_latest_summary(self, channel_id: str) -> Optional[dict]:
+    async def get_latest_summary(self, channel_id: str) -> Optional[dict]:
         """Get the most recent summary for a channel."""
-        result = self.client.table("summaries") \
-            .select("*") \
+        result = await self.client.table("summaries") \
+            .select(_SUMMARY_COLUMNS_WITH_METADATA) \
             .eq("channel_id", channel_id) \
             .order("created_at", desc=True) \
             .limit(1) \
@@ -131,14 +388,14 @@ class Database:
         
         return result.data[0] if result.data else None
     
-    def get_recent_summaries(
+    async def get_recent_summaries(
         self, 
         channel_id: str, 
         limit: int = 5
     ) -> list[dict]:
         """Get recent summaries for context."""
-        result = self.client.table("summaries") \
-            .select("*") \
+        result = await self.client.table("summaries") \
+            .select(_SUMMARY_COLUMNS) \
             .eq("channel_id", channel_id) \
             .order("created_at", desc=True) \
             .limit(limit) \
@@ -150,101 +407,226 @@ class Database:
     # Suggestions
     # ========================================================
     
-    def save_suggestion(self, suggestion: Suggestion) -> dict:
+    async def save_suggestion(self, suggestion: Suggestion) -> dict:
         """Save a content suggestion."""
-        data = {
-            "summary_id": suggestion.summary_id,
-            "insight": suggestion.insight,
-            "linkedin_draft": suggestion.linkedin_draft,
-            "x_draft": suggestion.x_draft,
-            "status": suggestion.status.value
-        }
-        result = self.client.table("suggestions").insert(data).execute()
+        data = suggestion.model_dump(mode="json", include=_SUGGESTION_WRITE_FIELDS)
+        result = await self.client.table("suggestions").insert(data).execute()
         return result.data[0] if result.data else {}
     
-    def update_suggestion_status(
+    async def update_suggestion_status(
         self, 
         suggestion_id: str, 
         status: SuggestionStatus
     ) -> dict:
         """Update the status of a suggestion."""
-        result = self.client.table("suggestions") \
+        result = await self.client.table("suggestions") \
             .update({"status": status.value}) \
             .eq("id", suggestion_id) \
             .execute()
         return result.data[0] if result.data else {}
     
-    def get_suggestion(self, suggestion_id: str) -> Optional[dict]:
+    async def get_suggestion(self, suggestion_id: str) -> Optional[dict]:
         """Get a suggestion by ID."""
-        result = self.client.table("suggestions") \
-            .select("*") \
+        result = await self.client.table("suggestions") \
+            .select(_SUGGESTION_COLUMNS) \
             .eq("id", suggestion_id) \
             .execute()
         return result.data[0] if result.data else None
     
-    def get_suggestions_today(self) -> list[dict]:
-        """Get all suggestions created today."""
-        today_start = datetime.utcnow().replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
-        result = self.client.table("suggestions") \
-            .select("*") \
-            .gte("created_at", today_start.isoformat()) \
+    async def get_suggestions_today(self) -> list[dict]:
+        """
+        Get all suggestions created today (UTC).
+        
+        The day boundary is computed server-side by get_suggestions_today().
+        """
+        result = await self.client.rpc("get_suggestions_today") \
+            .select(_SUGGESTION_COLUMNS) \
             .execute()
         return result.data
     
-    def get_saved_suggestions(self, limit: int = 10) -> list[dict]:
-        """Get saved suggestions."""
-        result = self.client.table("suggestions") \
-            .select("*") \
+    async def count_suggestions_today(self) -> int:
+        """Count suggestions created today without fetching rows."""
+        result = await self.client.rpc(
+            "get_suggestions_today", 
+            count="exact", 
+            head=True
+        ).execute()
+        return result.count or 0
+    
+    async def get_saved_suggestions(
+        self, 
+        limit: int = 10, 
+        insight_preview_chars: Optional[int] = None
+    ) -> list[dict]:
+        """
+        Get saved suggestions.
+        
+        With insight_preview_chars, only id, created_at and the insight cut
+        to that many characters are returned, truncated server-side by
+        get_saved_suggestion_previews().
+        """
+        if insight_preview_chars is not None:
+            result = await self.client.rpc(
+                "get_saved_suggestion_previews", 
+                {"max_rows": limit, "preview_chars": insight_preview_chars}
+            ).execute()
+            return result.data or []
+        
+        result = await self.client.table("suggestions") \
+            .select(_SUGGESTION_COLUMNS) \
             .eq("status", SuggestionStatus.SAVED.value) \
             .order("created_at", desc=True) \
             .limit(limit) \
             .execute()
         return result.data
     
+    async def count_saved_suggestions(self) -> int:
+        """Count saved suggestions without fetching rows."""
+        result = await self.client.table("suggestions") \
+            .select("id", count="exact", head=True) \
+            .eq("status", SuggestionStatus.SAVED.value) \
+            .execute()
+        return result.count or 0
+    
+    async def find_fingerprints(self, fingerprints: list[str]) -> set[str]:
+        """Return which of the given insight fingerprints already have a suggestion."""
+        if not fingerprints:
+            return set()
+        result = await self.client.table("suggestions") \
+            .select("fingerprint") \
+            .in_("fingerprint", fingerprints) \
+            .execute()
+        return {row["fingerprint"] for row in result.data}
+    
+    async def save_suggestion_message(
+        self, 
+        channel_id: str, 
+        message_ts: str, 
+        suggestion_id: str
+    ) -> None:
+        """Record the Slack message a suggestion was sent in."""
+        await self.client.table("suggestion_messages") \
+            .upsert(
+                {
+                    "channel_id": channel_id, 
+                    "message_ts": message_ts, 
+                    "suggestion_id": suggestion_id
+                }, 
+                on_conflict="channel_id,message_ts",
+                returning=ReturnMethod.minimal
+            ) \
+            .execute()
+    
+    async def get_suggestion_id_for_message(
+        self, 
+        channel_id: str, 
+        message_ts: str
+    ) -> Optional[str]:
+        """Get the ID of the suggestion sent in a Slack message, if any."""
+        result = await self.client.table("suggestion_messages") \
+            .select("suggestion_id") \
+            .eq("channel_id", channel_id) \
+            .eq("message_ts", message_ts) \
+            .execute()
+        return result.data[0]["suggestion_id"] if result.data else None
+    
     # ========================================================
     # Listening Channels
     # ========================================================
     
-    def add_listening_channel(
+    async def add_listening_channel(
         self, 
         channel_id: str, 
         user_id: str
     ) -> dict:
         """Add a channel to listen to."""
-        data = {
-            "channel_id": channel_id,
-            "added_by": user_id,
-            "added_at": datetime.utcnow().isoformat()
-        }
-        result = self.client.table("listening_channels") \
+        rows = await self.add_listening_channels([channel_id], user_id)
+        return rows[0] if rows else {}
+    
+    async def add_listening_channels(
+        self, 
+        channel_ids: list[str], 
+        user_id: str
+    ) -> list[dict]:
+        """Add several channels to listen to in one upsert."""
+        if not channel_ids:
+            return []
+        
+        added_at = datetime.now(timezone.utc).isoformat()
+        data = [
+            {"channel_id": channel_id, "added_by": user_id, "added_at": added_at}
+            for channel_id in channel_ids
+        ]
+        result = await self.client.table("listening_channels") \
             .upsert(data, on_conflict="channel_id") \
             .execute()
-        return result.data[0] if result.data else {}
+        self._invalidate_channels_cache()
+        return result.data or []
     
-    def remove_listening_channel(self, channel_id: str) -> bool:
+    async def remove_listening_channel(self, channel_id: str) -> bool:
         """Remove a channel from listening."""
-        self.client.table("listening_channels") \
+        return await self.remove_listening_channels([channel_id])
+    
+    async def remove_listening_channels(self, channel_ids: list[str]) -> bool:
+        """Remove several channels from listening in one delete."""
+        if not channel_ids:
+            return True
+        
+        await self.client.table("listening_channels") \
             .delete() \
-            .eq("channel_id", channel_id) \
+            .in_("channel_id", channel_ids) \
             .execute()
+        self._invalidate_channels_cache()
         return True
     
-    def get_listening_channels(self) -> list[str]:
+    async def get_listening_channels(self) -> list[str]:
         """Get all channels the bot is listening to."""
-        result = self.client.table("listening_channels") \
-            .select("channel_id") \
-            .execute()
-        return [row["channel_id"] for row in result.data]
+        return list(await self.listening_channel_set())
+    
+    async def is_listening(self, channel_id: str) -> bool:
+        """
+        Check if bot is listening to a channel.
+        
+        Answered from the cached channel set; only a stale cache hits the DB.
+        """
+        return channel_id in await self.listening_channel_set()
     
-    def is_listening(self, channel_id: str) -> bool:
-        """Check if bot is listening to a channel."""
-        result = self.client.table("listening_channels") \
+    async def listening_channel_set(self) -> frozenset[str]:
+        """
+        Get listening channels as a set, refetching once the cache goes stale.
+        
+        Use this for bulk membership checks; the cached set is returned as-is.
+        """
+        fetched_at, channels = self._channels_cache
+        if time.monotonic() - fetched_at < self._channels_cache_ttl:
+            return channels
+        
+        result = await self.client.table("listening_channels") \
             .select("channel_id") \
-            .eq("channel_id", channel_id) \
             .execute()
-        return len(result.data) > 0
+        channels = frozenset(row["channel_id"] for row in result.data)
+        self._channels_cache = (time.monotonic(), channels)
+        return channels
+    
+    def _invalidate_channels_cache(self) -> None:
+        """Force the next listening-channel lookup to hit the database."""
+        self._channels_cache = (float("-inf"), frozenset())
+    
+    # ========================================================
+    # Dashboard
+    # ========================================================
+    
+    async def dashboard(self, window_minutes: int = 60) -> dict:
+        """
+        Get listening/suggestion counts and per-channel buffer stats.
+        
+        Computed server-side by the chorus_dashboard() RPC.
+        """
+        result = await self.client.rpc(
+            "chorus_dashboard", 
+            {"window_minutes": window_minutes}
+        ).execute()
+        return result.data or {}
 
 
 # Singleton instance
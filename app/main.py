@@ -14,6 +14,8 @@ from app.config import get_settings
 from app.slack_handler import get_slack_bot
 from app.services.pipeline import get_pipeline
 from app.database import get_database
+from app.services.llm import get_llm
+from app.models import ChannelBatch
 
 # Configure logging
 logging.basicConfig(
@@ -47,16 +49,27 @@ async def scheduled_pipeline_run():
         if suggestions:
             logger.info(f"Generated {len(suggestions)} suggestion(s)")
             
-            # Send suggestions to founder
-            for suggestion in suggestions:
-                content = suggestion.get("content")
-                if content:
-                    await slack_bot.send_dm_suggestion(
-                        user_id=settings.founder_user_id,
-                        content=content,
-                        suggestion_id=suggestion.get("id", ""),
-                        client=slack_bot.app.client
-                    )
+            # Queue suggestions to the founder; the bot's outbox sends them
+            # in order and backs off on rate limits. Every DM goes to the
+            # same channel, so it is opened once for the whole run.
+            slack_client = slack_bot.app.client
+            dm_channel = await slack_bot.open_dm_channel(
+                settings.founder_user_id, 
+                slack_client
+            )
+            
+            results = await asyncio.gather(
+                *(slack_bot.send_content(
+                    channel=dm_channel,
+                    content=s["content"],
+                    suggestion_id=s.get("id", ""),
+                    client=slack_client
+                ) for s in suggestions if s.get("content")),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to deliver suggestion: {result}")
         else:
             logger.info("No suggestions generated this run")
             
@@ -73,8 +86,16 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Chorus bot...")
     
     settings = get_settings()
+    
+    # Create the shared database client once, before anything uses it
+    db = get_database()
     slack_bot = get_slack_bot()
     
+    # Start the batched message writer and Slack ingest/outbound queues
+    db.start_message_writer()
+    slack_bot.start_ingest()
+    slack_bot.start_outbox()
+    
     # Start Socket Mode handler for Slack events
     socket_handler = AsyncSocketModeHandler(
         slack_bot.get_app(),
@@ -101,6 +122,10 @@ async def lifespan(app: FastAPI):
     if socket_handler:
         await socket_handler.close_async()
     scheduler.shutdown()
+    await slack_bot.stop_ingest()
+    await slack_bot.stop_outbox()
+    await get_llm().close()
+    await db.close()
 
 
 # Create FastAPI app
@@ -127,11 +152,12 @@ async def health():
     """Detailed health check."""
     settings = get_settings()
     db = get_database()
+    dashboard = await db.dashboard(settings.buffer_window_minutes)
     
     return {
         "status": "healthy",
-        "listening_channels": len(db.get_listening_channels()),
-        "suggestions_today": len(db.get_suggestions_today()),
+        "listening_channels": dashboard.get("listening_channels_count", 0),
+        "suggestions_today": dashboard.get("suggestions_today_count", 0),
         "max_daily_suggestions": settings.max_suggestions_per_day
     }
 
@@ -150,16 +176,33 @@ async def trigger_pipeline(background_tasks: BackgroundTasks):
 async def list_channels():
     """List channels the bot is listening to."""
     db = get_database()
-    channels = db.get_listening_channels()
+    channels = await db.get_listening_channels()
     return {"channels": channels, "count": len(channels)}
 
 
+@app.post("/api/channels")
+async def add_channels(batch: ChannelBatch):
+    """Add several channels to listen to in one request."""
+    db = get_database()
+    settings = get_settings()
+    await db.add_listening_channels(batch.channel_ids, settings.founder_user_id)
+    return {"status": "added", "channel_ids": batch.channel_ids}
+
+
+@app.delete("/api/channels")
+async def remove_channels(batch: ChannelBatch):
+    """Remove several channels from listening in one request."""
+    db = get_database()
+    await db.remove_listening_channels(batch.channel_ids)
+    return {"status": "removed", "channel_ids": batch.channel_ids}
+
+
 @app.post("/api/channels/{channel_id}")
 async def add_channel(channel_id: str):
     """Add a channel to listen to."""
     db = get_database()
     settings = get_settings()
-    db.add_listening_channel(channel_id, settings.founder_user_id)
+    await db.add_listening_channel(channel_id, settings.founder_user_id)
     return {"status": "added", "channel_id": channel_id}
 
 
@@ -167,7 +210,7 @@ async def add_channel(channel_id: str):
 async def remove_channel(channel_id: str):
     """Remove a channel from listening."""
     db = get_database()
-    db.remove_listening_channel(channel_id)
+    await db.remove_listening_channel(channel_id)
     return {"status": "removed", "channel_id": channel_id}
 
 
@@ -177,9 +220,9 @@ async def list_suggestions(status: str = None, limit: int = 10):
     db = get_database()
     
     if status == "saved":
-        suggestions = db.get_saved_suggestions(limit=limit)
+        suggestions = await db.get_saved_suggestions(limit=limit)
     else:
-        suggestions = db.get_suggestions_today()
+        suggestions = await db.get_suggestions_today()
     
     return {"suggestions": suggestions, "count": len(suggestions)}
 
@@ -188,7 +231,7 @@ async def list_suggestions(status: str = None, limit: int = 10):
 async def get_suggestion(suggestion_id: str):
     """Get a specific suggestion."""
     db = get_database()
-    suggestion = db.get_suggestion(suggestion_id)
+    suggestion = await db.get_suggestion(suggestion_id)
     
     if not suggestion:
         raise HTTPException(status_code=404, detail="Suggestion not found")
@@ -205,24 +248,25 @@ async def debug_status():
     settings = get_settings()
     buffer_service = get_buffer_service()
     
-    channels = db.get_listening_channels()
+    dashboard = await db.dashboard(settings.buffer_window_minutes)
     channel_status = []
     
-    for channel_id in channels:
-        messages = buffer_service.get_buffer_from_db(channel_id)
+    for channel in dashboard.get("channels", []):
+        channel_id = channel["channel_id"]
+        message_count = channel["message_count"]
         channel_status.append({
             "channel_id": channel_id,
-            "message_count": len(messages),
+            "message_count": message_count,
             "min_required": settings.min_messages_for_summary,
-            "ready_to_summarize": buffer_service.should_summarize(channel_id),
+            "ready_to_summarize": await buffer_service.should_summarize(channel_id, message_count),
             "recent_messages": [
-                {"user": m.user_id[-4:], "text": m.text[:50] + "..." if len(m.text) > 50 else m.text}
-                for m in messages[-5:]  # Show last 5 messages
+                {"user": m["user_id"][-4:], "text": m["text"][:50] + "..." if len(m["text"]) > 50 else m["text"]}
+                for m in channel["recent_messages"]  # Last 5 messages
             ]
         })
     
     return {
-        "listening_channels": len(channels),
+        "listening_channels": dashboard.get("listening_channels_count", 0),
         "min_messages_for_summary": settings.min_messages_for_summary,
         "buffer_window_minutes": settings.buffer_window_minutes,
         "channels": channel_status
@@ -239,7 +283,6 @@ async def force_trigger_pipeline(background_tasks: BackgroundTasks):
     from app.services.summarizer import get_summarizer
     from app.services.detector import get_detector
     from app.services.generator import get_generator
-    from app.models import SummaryMetadata
     
     settings = get_settings()
     db = get_database()
@@ -249,11 +292,16 @@ async def force_trigger_pipeline(background_tasks: BackgroundTasks):
     generator = get_generator()
     slack_bot = get_slack_bot()
     
-    channels = db.get_listening_channels()
+    # Bind loop-invariant lookups once
+    founder_id = settings.founder_user_id
+    slack_client = slack_bot.app.client
+    
+    channels = await db.get_listening_channels()
+    buffers = await buffer_service.get_buffers_from_db()
     results = []
     
     for channel_id in channels:
-        messages = buffer_service.get_buffer_from_db(channel_id)
+        messages = buffers.get(channel_id, [])
         if not messages:
             results.append({"channel": channel_id, "status": "no messages"})
             continue
@@ -261,28 +309,20 @@ async def force_trigger_pipeline(background_tasks: BackgroundTasks):
         logger.info(f"Force processing {len(messages)} messages from {channel_id}")
         
         # Summarize
-        summary = summarizer.summarize_conversation(messages)
+        summary = await summarizer.asummarize_conversation(messages)
         if not summary:
             results.append({"channel": channel_id, "status": "summarization failed"})
             continue
         
         # Save summary
-        metadata = SummaryMetadata(
-            key_ideas=summary.key_ideas,
-            opinions=summary.opinions,
-            decisions=summary.decisions,
-            interesting_phrases=summary.interesting_phrases,
-            message_count=len(messages),
-            window_start=messages[0].timestamp,
-            window_end=messages[-1].timestamp
-        )
-        summary_record = db.save_summary(channel_id, summary.summary, metadata)
+        metadata = summarizer.build_metadata(summary, messages)
+        summary_record = await db.save_summary(channel_id, summary.summary, metadata)
         
         # Clear buffer
         buffer_service.clear_buffer(channel_id)
         
         # Detect post-worthy
-        detection = detector.detect_post_worthy(summary)
+        detection = await detector.adetect_post_worthy(summary)
         if not detection.is_post_worthy:
             results.append({
                 "channel": channel_id, 
@@ -293,15 +333,15 @@ async def force_trigger_pipeline(background_tasks: BackgroundTasks):
         
         # Generate content
         for idea in detection.ideas[:1]:  # Just first idea for testing
-            content = generator.generate_content(idea, summary.summary)
-            saved = generator.save_suggestion(content, summary_record.get("id"))
+            content = await generator.agenerate_content(idea, summary.summary)
+            saved = await generator.save_suggestion(content, summary_record.get("id"))
             
             # Send DM
             await slack_bot.send_dm_suggestion(
-                user_id=settings.founder_user_id,
+                user_id=founder_id,
                 content=content,
                 suggestion_id=saved.get("id", ""),
-                client=slack_bot.app.client
+                client=slack_client
             )
             
             results.append({
@@ -1,10 +1,12 @@
 """
 Pydantic models for Chorus bot.
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
+from collections import deque
 from enum import Enum
+import time
 
 
 # ============================================================
@@ -21,10 +23,18 @@ class SlackMessage(BaseModel):
 
 
 class MessageBuffer(BaseModel):
-    """Buffer of messages for a channel."""
+    """
+    Buffer of messages for a channel.
+    
+    messages keeps only the most recent messages (bounded deque);
+    message_count counts every message added since the buffer started.
+    """
     channel_id: str
-    messages: list[SlackMessage] = []
+    messages: deque[SlackMessage] = Field(default_factory=deque)
+    message_count: int = 0
     started_at: datetime
+    # Monotonic twin of started_at, used for window checks
+    started_at_monotonic: float = Field(default_factory=time.monotonic)
     
 
 # ============================================================
@@ -38,6 +48,8 @@ class ConversationSummary(BaseModel):
     opinions: list[str]
     decisions: list[str]
     interesting_phrases: list[str]
+    # Oldest messages left out to fit the token budget
+    dropped_message_count: int = 0
 
 
 class SummaryMetadata(BaseModel):
@@ -49,6 +61,7 @@ class SummaryMetadata(BaseModel):
     message_count: int
     window_start: datetime
     window_end: datetime
+    dropped_message_count: int = 0
 
 
 # ============================================================
@@ -98,6 +111,7 @@ class Suggestion(BaseModel):
     linkedin_draft: str
     x_draft: str
     status: SuggestionStatus = SuggestionStatus.PENDING
+    fingerprint: Optional[str] = None
     created_at: Optional[datetime] = None
 
 
@@ -110,3 +124,12 @@ class ListeningChannel(BaseModel):
     channel_id: str
     added_at: datetime
     added_by: str
+
+
+# ============================================================
+# API Models
+# ============================================================
+
+class ChannelBatch(BaseModel):
+    """Request body for bulk channel operations."""
+    channel_ids: list[str]
@@ -2,6 +2,35 @@
 Prompt templates for Chorus bot LLM interactions.
 All prompts are drop-in ready as specified in the PRD.
 """
+from string import Formatter
+
+
+class PromptTemplate(str):
+    """
+    A prompt string whose placeholders are parsed once at import.
+    
+    format() joins the pre-split literal parts with the keyword values
+    instead of re-parsing the template on every call. Only bare {name}
+    fields are supported.
+    """
+    
+    def __new__(cls, template: str):
+        self = super().__new__(cls, template)
+        parts = []
+        for literal, field, spec, conversion in Formatter().parse(template):
+            if spec or conversion or (field is not None and not field.isidentifier()):
+                raise ValueError(f"Unsupported placeholder in prompt: {{{field}}}")
+            parts.append((literal, field))
+        self._parts = tuple(parts)
+        return self
+    
+    def format(self, **values) -> str:
+        """Fill in the placeholders."""
+        return "".join([
+            literal if field is None else literal + str(values[field])
+            for literal, field in self._parts
+        ])
+
 
 # ============================================================
 # SYSTEM PROMPT (GLOBAL)
@@ -20,7 +49,7 @@ You have taste. You know the difference between a throwaway comment and a hard-w
 # CONVERSATION SUMMARIZER
 # ============================================================
 
-SUMMARIZER_PROMPT = """Summarize the following Slack conversation from a founding team.
+SUMMARIZER_PROMPT = PromptTemplate("""Summarize the following Slack conversation from a founding team.
 
 This could be anything - product strategy, growth experiments, technical debates, hiring rants, random tangents, jokes, or just people thinking out loud. Treat it all as raw material.
 
@@ -43,14 +72,48 @@ Respond with a JSON object in this exact format:
   "opinions": ["opinion 1", "opinion 2"],
   "decisions": ["decision 1"],
   "interesting_phrases": ["phrase 1", "phrase 2"]
-}}"""
+}}""")
+
+
+# ============================================================
+# BATCH CONVERSATION SUMMARIZER (several channels in one call)
+# ============================================================
+
+BATCH_SUMMARIZER_PROMPT = PromptTemplate("""Summarize each of the following Slack conversations from a founding team. They come from different channels, so summarize each one on its own.
+
+These could be anything - product strategy, growth experiments, technical debates, hiring rants, random tangents, jokes, or just people thinking out loud. Treat it all as raw material.
+
+For each conversation, extract:
+- Key ideas discussed (product, growth, tech, team, whatever came up)
+- Opinions or strong views (even if casual or half-joking)
+- Decisions made (if any)
+- Interesting phrasing, metaphors, or turns of phrase
+- Any hard-won realizations or "aha" moments
+
+Be concise but insightful. Capture the texture of each conversation.
+
+{conversations}
+
+Respond with a JSON object in this exact format, with one entry per conversation, using its number as the id:
+{{
+  "summaries": [
+    {{
+      "id": 1,
+      "summary": "A concise summary of the conversation",
+      "key_ideas": ["idea 1", "idea 2"],
+      "opinions": ["opinion 1", "opinion 2"],
+      "decisions": ["decision 1"],
+      "interesting_phrases": ["phrase 1", "phrase 2"]
+    }}
+  ]
+}}""")
 
 
 # ============================================================
 # POST-WORTHINESS DETECTOR
 # ============================================================
 
-POST_WORTHINESS_PROMPT = """Based on the summary below, decide if there is any post-worthy insight.
+POST_WORTHINESS_PROMPT = PromptTemplate("""Based on the summary below, decide if there is any post-worthy insight.
 
 A post-worthy insight is:
 - Founder-relevant
@@ -83,16 +146,16 @@ Respond with a JSON object in this exact format:
   ]
 }}
 
-Only include genuinely interesting insights. Quality over quantity."""
+Only include genuinely interesting insights. Quality over quantity.""")
 
 
 # ============================================================
-# LINKEDIN POST GENERATOR
+# COMBINED POST GENERATOR (LinkedIn + X in one call)
 # ============================================================
 
-LINKEDIN_PROMPT = """Write a LinkedIn post in the voice of a thoughtful founder.
+COMBINED_POST_PROMPT = PromptTemplate("""Write two posts about the insight below: one for LinkedIn and one for Twitter/X.
 
-Guidelines:
+LinkedIn post, in the voice of a thoughtful founder:
 - 5–8 short paragraphs
 - Plainspoken, honest
 - No emojis
@@ -100,6 +163,13 @@ Guidelines:
 - No hashtags
 - End with a reflective question
 
+X post:
+- Max 280 characters
+- Direct and opinionated
+- Founder-to-founder tone
+- No hashtags unless essential
+- No emojis
+
 Insight:
 {core_insight}
 
@@ -109,36 +179,26 @@ Context:
 Why this works:
 {why_it_works}
 
-Write the post directly, no preamble or explanation. Just the post content."""
-
-
-# ============================================================
-# X POST GENERATOR
-# ============================================================
-
-X_POST_PROMPT = """Write a Twitter/X post.
-
-Guidelines:
-- Max 280 characters
-- Direct and opinionated
-- Founder-to-founder tone
-- No hashtags unless essential
-- No emojis
-
-Insight:
-{core_insight}
+Write each post directly, no preamble or explanation.
 
-Write the post directly, no preamble or explanation. Just the tweet."""
+Respond with a JSON object in this exact format:
+{{
+  "linkedin_draft": "The LinkedIn post",
+  "x_draft": "The tweet"
+}}""")
 
 
 # ============================================================
 # REWRITE PROMPTS
 # ============================================================
 
-REWRITE_LINKEDIN_PROMPT = """Rewrite this LinkedIn post with a fresh angle.
+COMBINED_REWRITE_PROMPT = PromptTemplate("""Rewrite this LinkedIn post and this tweet with a fresh angle.
 
-Original post:
-{original_draft}
+Original LinkedIn post:
+{original_linkedin}
+
+Original tweet:
+{original_x}
 
 Core insight:
 {core_insight}
@@ -146,7 +206,7 @@ Core insight:
 Context:
 {summary}
 
-Guidelines:
+LinkedIn guidelines:
 - 5–8 short paragraphs
 - Plainspoken, honest
 - No emojis
@@ -155,18 +215,7 @@ Guidelines:
 - End with a reflective question
 - Take a DIFFERENT angle than the original
 
-Write the post directly, no preamble or explanation."""
-
-
-REWRITE_X_PROMPT = """Rewrite this tweet with a fresh angle.
-
-Original tweet:
-{original_draft}
-
-Core insight:
-{core_insight}
-
-Guidelines:
+Tweet guidelines:
 - Max 280 characters
 - Direct and opinionated
 - Founder-to-founder tone
@@ -174,43 +223,24 @@ Guidelines:
 - No emojis
 - Take a DIFFERENT angle than the original
 
-Write the tweet directly, no preamble or explanation."""
-
-
-# ============================================================
-# DEDUPLICATION CHECK
-# ============================================================
-
-DEDUPLICATION_PROMPT = """Compare these insights and determine if the new insight is too similar to any existing ones.
+Write each post directly, no preamble or explanation.
 
-Existing insights:
-{existing_insights}
-
-New insight:
-{new_insight}
-
-Return JSON:
+Respond with a JSON object in this exact format:
 {{
-  "is_duplicate": true/false,
-  "reason": "Brief explanation if duplicate"
-}}
-
-Only mark as duplicate if the core idea is essentially the same."""
+  "linkedin_draft": "The rewritten LinkedIn post",
+  "x_draft": "The rewritten tweet"
+}}""")
 
 
 # ============================================================
-# SENSITIVITY CHECK
+# COMBINED FILTER (dedup + sensitivity, batched)
 # ============================================================
 
-SENSITIVITY_PROMPT = """Review this insight for any sensitive or private information that should NOT be shared publicly.
+COMBINED_FILTER_PROMPT = PromptTemplate("""Review each new insight below for two things.
 
-Insight:
-{insight}
+1. Duplication: is it too similar to any existing insight, or to an earlier new insight in this list? Only mark as duplicate if the core idea is essentially the same.
 
-Context summary:
-{summary}
-
-Check for:
+2. Sensitivity: does it contain sensitive or private information that should NOT be shared publicly? Check for:
 - Personal financial details
 - Health information
 - Private business metrics (revenue, runway, etc.)
@@ -218,8 +248,23 @@ Check for:
 - Confidential deal or partnership details
 - Anything that could harm someone's reputation
 
-Return JSON:
+Existing insights:
+{existing_insights}
+
+New insights:
+{new_insights}
+
+Context summary:
+{summary}
+
+Return JSON with one result per new insight, using its number as the id:
 {{
-  "is_sensitive": true/false,
-  "reason": "Explanation if sensitive"
-}}"""
+  "results": [
+    {{
+      "id": 1,
+      "is_duplicate": true/false,
+      "is_sensitive": true/false,
+      "reason": "Brief explanation if duplicate or sensitive"
+    }}
+  ]
+}}""")
@@ -2,9 +2,12 @@
 Message buffering service for Chorus bot.
 Implements rolling time-based window strategy.
 """
-from datetime import datetime, timedelta
+from datetime import datetime
+from collections import deque
+from functools import lru_cache
 from typing import Optional
 import logging
+import time
 
 from app.config import get_settings
 from app.models import SlackMessage, MessageBuffer
@@ -26,104 +29,147 @@ class BufferService:
     def __init__(self):
         self.settings = get_settings()
         self.db = get_database()
-        # In-memory buffers per channel (for real-time tracking)
+        # In-memory buffers per channel (for real-time tracking). The DB
+        # holds the full history, so only the tail is kept in memory.
         self._buffers: dict[str, MessageBuffer] = {}
+        self._buffer_maxlen = self.settings.min_messages_for_summary * 2
+    
+    def _new_buffer(self, channel_id: str) -> MessageBuffer:
+        """Create an empty, bounded buffer for a channel."""
+        return MessageBuffer(
+            channel_id=channel_id,
+            messages=deque(maxlen=self._buffer_maxlen),
+            started_at=datetime.utcnow()
+        )
     
     def add_message(self, message: SlackMessage) -> None:
-        """Add a message to the buffer and persist to DB."""
+        """Add a message to the buffer and queue it for persistence."""
         channel_id = message.channel_id
         
-        # Save to database
-        self.db.save_message(message)
+        # Queue for the next batched insert
+        self.db.enqueue_message(message)
         
         # Update in-memory buffer
-        if channel_id not in self._buffers:
-            self._buffers[channel_id] = MessageBuffer(
-                channel_id=channel_id,
-                messages=[],
-                started_at=datetime.utcnow()
-            )
+        buffer = self._buffers.get(channel_id)
+        if buffer is None:
+            buffer = self._buffers[channel_id] = self._new_buffer(channel_id)
         
-        self._buffers[channel_id].messages.append(message)
+        buffer.messages.append(message)
+        buffer.message_count += 1
         logger.info(f"Added message to buffer for channel {channel_id}. "
-                   f"Buffer size: {len(self._buffers[channel_id].messages)}")
+                   f"Buffer size: {buffer.message_count}")
+    
+    def add_messages(self, messages: list[SlackMessage]) -> None:
+        """Add a batch of messages to their buffers and queue them for persistence."""
+        enqueue = self.db.enqueue_message
+        for message in messages:
+            enqueue(message)
+            
+            buffer = self._buffers.get(message.channel_id)
+            if buffer is None:
+                buffer = self._buffers[message.channel_id] = self._new_buffer(message.channel_id)
+            buffer.messages.append(message)
+            buffer.message_count += 1
+        
+        logger.info(f"Added {len(messages)} message(s) to buffers")
     
     def get_buffer(self, channel_id: str) -> Optional[MessageBuffer]:
         """Get current buffer for a channel."""
         return self._buffers.get(channel_id)
     
-    def get_buffer_from_db(self, channel_id: str) -> list[SlackMessage]:
+    async def get_buffer_from_db(self, channel_id: str) -> list[SlackMessage]:
         """Get buffered messages from database within the time window."""
-        return self.db.get_messages_in_window(
+        return await self.db.get_messages_in_window(
             channel_id, 
             self.settings.buffer_window_minutes
         )
     
-    def should_summarize(self, channel_id: str) -> bool:
+    async def get_buffers_from_db(
+        self, 
+        min_messages: int = 1
+    ) -> dict[str, list[SlackMessage]]:
+        """
+        Get buffered messages for all listening channels in one query.
+        
+        Only channels with at least min_messages in the window are returned.
+        """
+        return await self.db.get_ready_buffers(
+            min_messages, 
+            self.settings.buffer_window_minutes
+        )
+    
+    async def should_summarize(
+        self, 
+        channel_id: str, 
+        message_count: Optional[int] = None
+    ) -> bool:
         """
         Check if buffer should be summarized.
         
         Triggers:
         - Time window exceeded (60 minutes default)
         - Minimum message count reached (8 messages default)
+        
+        Pass message_count when the DB count is already known to skip
+        the lookup.
         """
         buffer = self._buffers.get(channel_id)
-        if not buffer or not buffer.messages:
+        if not buffer or not buffer.message_count:
             # Check database for messages
-            db_messages = self.get_buffer_from_db(channel_id)
-            if len(db_messages) >= self.settings.min_messages_for_summary:
-                return True
-            return False
+            if message_count is None:
+                message_count = await self.db.count_messages_in_window(
+                    channel_id, 
+                    self.settings.buffer_window_minutes
+                )
+            return message_count >= self.settings.min_messages_for_summary
         
         # Check message count
-        if len(buffer.messages) >= self.settings.min_messages_for_summary:
+        if buffer.message_count >= self.settings.min_messages_for_summary:
             return True
         
         # Check time window
-        window_elapsed = datetime.utcnow() - buffer.started_at
-        if window_elapsed >= timedelta(minutes=self.settings.buffer_window_minutes):
+        elapsed = time.monotonic() - buffer.started_at_monotonic
+        if elapsed >= self.settings.buffer_window_minutes * 60:
             # Only summarize if we have at least some messages
-            if len(buffer.messages) >= 3:
+            if buffer.message_count >= 3:
                 return True
         
         return False
     
-    def get_messages_for_summary(self, channel_id: str) -> list[SlackMessage]:
+    async def get_messages_for_summary(
+        self, 
+        channel_id: str, 
+        db_messages: Optional[list[SlackMessage]] = None
+    ) -> list[SlackMessage]:
         """Get all messages that should be summarized."""
         # Prefer database source for completeness
-        db_messages = self.get_buffer_from_db(channel_id)
+        if db_messages is None:
+            db_messages = await self.get_buffer_from_db(channel_id)
         if db_messages:
             return db_messages
         
         # Fallback to in-memory
         buffer = self._buffers.get(channel_id)
-        return buffer.messages if buffer else []
+        return list(buffer.messages) if buffer else []
     
     def clear_buffer(self, channel_id: str) -> None:
         """Clear the buffer after summarization."""
         if channel_id in self._buffers:
-            self._buffers[channel_id] = MessageBuffer(
-                channel_id=channel_id,
-                messages=[],
-                started_at=datetime.utcnow()
-            )
+            self._buffers[channel_id] = self._new_buffer(channel_id)
         logger.info(f"Cleared buffer for channel {channel_id}")
     
+    def format_message(self, msg: SlackMessage) -> str:
+        """Format one message as a transcript line."""
+        return f"[{msg.timestamp:%H:%M}] User {msg.user_id[-4:]}: {msg.text}"
+    
     def format_messages_for_llm(self, messages: list[SlackMessage]) -> str:
         """Format messages for LLM consumption."""
-        formatted = []
-        for msg in messages:
-            timestamp = msg.timestamp.strftime("%H:%M")
-            formatted.append(f"[{timestamp}] User {msg.user_id[-4:]}: {msg.text}")
-        return "\n".join(formatted)
+        format_message = self.format_message
+        return "\n".join(format_message(msg) for msg in messages)
 
 
 # Singleton instance
-_buffer_service: Optional[BufferService] = None
-
+@lru_cache(maxsize=1)
 def get_buffer_service() -> BufferService:
     """Get buffer service singleton."""
-    global _buffer_service
-    if _buffer_service is None:
-        _buffer_service = BufferService()
-    return _buffer_service
+    return BufferService()
@@ -1,20 +1,95 @@
 """
 Post-worthiness detection service for Chorus bot.
 """
+import hashlib
 import logging
-from typing import Optional
+import re
+from functools import lru_cache
+from typing import Iterable, Optional
 
 from app.models import PostWorthinessResult, PostIdea, ConversationSummary
 from app.database import get_database
 from app.services.llm import get_llm
 from app.prompts.templates import (
     POST_WORTHINESS_PROMPT, 
-    DEDUPLICATION_PROMPT,
-    SENSITIVITY_PROMPT
+    COMBINED_FILTER_PROMPT
 )
 
 logger = logging.getLogger(__name__)
 
+_NON_WORD_RE = re.compile(r"\W+")
+
+# Word-shingle Jaccard at or above this is a near-exact duplicate
+_NEAR_DUPLICATE_JACCARD = 0.8
+
+# Output cap per insight for the dedup + sensitivity JSON; a single-insight
+# check is capped at exactly this
+_FILTER_TOKENS_PER_INSIGHT = 200
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and collapse punctuation/whitespace runs to single spaces."""
+    return _NON_WORD_RE.sub(" ", text.lower()).strip()
+
+
+def insight_fingerprint(text: str) -> str:
+    """
+    Fingerprint an insight for exact-duplicate checks.
+    
+    Must match the backfill in the suggestions_fingerprint migration.
+    """
+    return hashlib.sha1(_normalize(text).encode()).hexdigest()
+
+
+def _shingles(text: str, size: int = 3) -> set[tuple[str, ...]]:
+    """Word shingles of a normalized text; short texts give one shingle."""
+    words = _normalize(text).split()
+    if len(words) <= size:
+        return {tuple(words)}
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    """Jaccard similarity of two sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class KnownInsights:
+    """
+    Insights new ideas are deduplicated against.
+    
+    Keeps the fingerprint set, shingles and prompt bullet list up to
+    date as insights are added, so no check rebuilds them.
+    """
+    
+    __slots__ = ("insights", "fingerprints", "shingles", "_bullets")
+    
+    def __init__(self, insights: Iterable[str] = ()):
+        self.insights: list[str] = []
+        self.fingerprints: set[str] = set()
+        self.shingles: list[set[tuple[str, ...]]] = []
+        self._bullets = ""
+        for insight in insights:
+            self.add(insight)
+    
+    def add(self, insight: str) -> None:
+        """Add an accepted insight."""
+        line = f"- {insight}"
+        self._bullets = f"{self._bullets}\n{line}" if self._bullets else line
+        self.insights.append(insight)
+        self.fingerprints.add(insight_fingerprint(insight))
+        self.shingles.append(_shingles(insight))
+    
+    def is_near_duplicate(self, shingles: set[tuple[str, ...]]) -> bool:
+        """Whether shingles nearly match any known insight."""
+        return any(_jaccard(shingles, other) >= _NEAR_DUPLICATE_JACCARD for other in self.shingles)
+    
+    def prompt_text(self) -> str:
+        """Bulleted list of known insights for the filter prompt."""
+        return self._bullets or "- None"
+
 
 class DetectorService:
     """
@@ -31,131 +106,182 @@ class DetectorService:
         self.db = get_database()
         self.llm = get_llm()
     
-    def detect_post_worthy(
+    async def adetect_post_worthy(
         self, 
         summary: ConversationSummary
     ) -> PostWorthinessResult:
         """
         Analyze a summary for post-worthy insights.
         """
-        # Format the prompt
-        prompt = POST_WORTHINESS_PROMPT.format(
+        prompt = self._detection_prompt(summary)
+        
+        try:
+            result = await self.llm.acomplete_json(prompt, temperature=0.4)
+            return self._parse_detection(result)
+        except Exception as e:
+            logger.error(f"Failed to detect post-worthiness: {e}")
+            return PostWorthinessResult(is_post_worthy=False, ideas=[])
+    
+    def _detection_prompt(self, summary: ConversationSummary) -> str:
+        """Format the post-worthiness prompt for a summary."""
+        return POST_WORTHINESS_PROMPT.format(
             summary=summary.summary,
             key_ideas="\n".join(f"- {idea}" for idea in summary.key_ideas),
             interesting_phrases="\n".join(f"- {phrase}" for phrase in summary.interesting_phrases)
         )
+    
+    def _parse_detection(self, result: dict) -> PostWorthinessResult:
+        """Build a PostWorthinessResult from the LLM's JSON response."""
+        ideas = []
+        for idea_data in result.get("ideas", []):
+            ideas.append(PostIdea(
+                core_insight=idea_data.get("core_insight", ""),
+                why_it_works=idea_data.get("why_it_works", "")
+            ))
         
+        return PostWorthinessResult(
+            is_post_worthy=result.get("is_post_worthy", False),
+            ideas=ideas
+        )
+    
+    async def _arun_checks(
+        self, 
+        prompt: str, 
+        insights: list[str]
+    ) -> Optional[list[dict]]:
+        """Run a formatted filter prompt and parse its per-insight results."""
         try:
-            result = self.llm.complete_json(prompt, temperature=0.4)
-            
-            ideas = []
-            for idea_data in result.get("ideas", []):
-                ideas.append(PostIdea(
-                    core_insight=idea_data.get("core_insight", ""),
-                    why_it_works=idea_data.get("why_it_works", "")
-                ))
-            
-            return PostWorthinessResult(
-                is_post_worthy=result.get("is_post_worthy", False),
-                ideas=ideas
+            result = await self.llm.acomplete_json(
+                prompt, 
+                temperature=0.2, 
+                max_tokens=_FILTER_TOKENS_PER_INSIGHT * len(insights)
             )
-            
         except Exception as e:
-            logger.error(f"Failed to detect post-worthiness: {e}")
-            return PostWorthinessResult(is_post_worthy=False, ideas=[])
+            logger.error(f"Failed to check ideas: {e}")
+            return None
+        
+        return self._parse_checks(result, insights)
     
-    def check_duplicate(
+    def _filter_prompt(
         self, 
-        new_insight: str, 
-        existing_insights: list[str]
-    ) -> bool:
-        """
-        Check if an insight is a duplicate of existing ones.
-        """
-        if not existing_insights:
-            return False
-        
-        prompt = DEDUPLICATION_PROMPT.format(
-            existing_insights="\n".join(f"- {i}" for i in existing_insights),
-            new_insight=new_insight
+        insights: list[str], 
+        existing_text: str, 
+        summary: str
+    ) -> str:
+        """Format the combined dedup + sensitivity prompt."""
+        return COMBINED_FILTER_PROMPT.format(
+            existing_insights=existing_text,
+            new_insights="\n".join(f"{n}. {i}" for n, i in enumerate(insights, 1)),
+            summary=summary or "N/A"
         )
+    
+    def _parse_checks(self, result: dict, insights: list[str]) -> list[dict]:
+        """Match the LLM's per-id results back to the insights, in order."""
+        by_id = {}
+        for item in result.get("results", []):
+            try:
+                by_id[int(item.get("id"))] = item
+            except (TypeError, ValueError):
+                continue
         
-        try:
-            result = self.llm.complete_json(prompt, temperature=0.2)
-            is_dup = result.get("is_duplicate", False)
+        checks = []
+        for n, insight in enumerate(insights, 1):
+            item = by_id.get(n)
+            if item is None:
+                # Unanswered insights are treated as sensitive, to be safe
+                logger.warning(f"No filter result for insight: {insight[:50]}")
+                checks.append({"is_duplicate": False, "is_sensitive": True})
+                continue
             
+            is_dup = bool(item.get("is_duplicate", False))
+            is_sensitive = bool(item.get("is_sensitive", False))
             if is_dup:
-                logger.info(f"Duplicate insight detected: {result.get('reason', 'N/A')}")
-            
-            return is_dup
-            
-        except Exception as e:
-            logger.error(f"Failed to check for duplicates: {e}")
-            return False
+                logger.info(f"Duplicate insight detected: {item.get('reason', 'N/A')}")
+            if is_sensitive:
+                logger.warning(f"Sensitive content detected: {item.get('reason', 'N/A')}")
+            checks.append({"is_duplicate": is_dup, "is_sensitive": is_sensitive})
+        
+        return checks
     
-    def check_sensitivity(
+    async def get_known_insights(self) -> KnownInsights:
+        """Get recent saved insights for deduplication."""
+        recent_suggestions = await self.db.get_saved_suggestions(limit=20)
+        return KnownInsights([s.get("insight", "") for s in recent_suggestions])
+    
+    async def _drop_known_duplicates(
         self, 
-        insight: str, 
-        summary: str
-    ) -> bool:
+        ideas: list[PostIdea], 
+        known: KnownInsights
+    ) -> list[PostIdea]:
         """
-        Check if an insight contains sensitive information.
-        Returns True if sensitive (should not be posted).
+        Cheap pre-filter run before the LLM check.
+        
+        Drops ideas whose fingerprint matches any stored suggestion or
+        known insight, and near-exact rewordings by shingle Jaccard.
         """
-        prompt = SENSITIVITY_PROMPT.format(
-            insight=insight,
-            summary=summary
-        )
+        fingerprints = [insight_fingerprint(idea.core_insight) for idea in ideas]
+        stored = await self.db.find_fingerprints(fingerprints)
+        seen = set()
         
-        try:
-            result = self.llm.complete_json(prompt, temperature=0.2)
-            is_sensitive = result.get("is_sensitive", False)
-            
-            if is_sensitive:
-                logger.warning(f"Sensitive content detected: {result.get('reason', 'N/A')}")
+        remaining = []
+        for idea, fingerprint in zip(ideas, fingerprints):
+            if fingerprint in stored or fingerprint in known.fingerprints or fingerprint in seen:
+                logger.info(f"Exact duplicate insight dropped: {idea.core_insight[:50]}")
+                continue
             
-            return is_sensitive
+            if known.is_near_duplicate(_shingles(idea.core_insight)):
+                logger.info(f"Near-duplicate insight dropped: {idea.core_insight[:50]}")
+                continue
             
-        except Exception as e:
-            logger.error(f"Failed to check sensitivity: {e}")
-            # Err on the side of caution
-            return True
+            seen.add(fingerprint)
+            remaining.append(idea)
+        
+        return remaining
     
-    def filter_ideas(
+    async def filter_ideas(
         self, 
         ideas: list[PostIdea], 
-        summary: str
+        summary: str,
+        known: Optional[KnownInsights] = None
     ) -> list[PostIdea]:
         """
         Filter ideas for duplicates and sensitivity.
+        
+        All ideas are checked in a single LLM call. Pass known to reuse
+        insights fetched once per run; accepted ideas are added to it so
+        later callers dedup against them too.
         """
-        # Get recent insights for deduplication
-        recent_suggestions = self.db.get_saved_suggestions(limit=20)
-        existing_insights = [s.get("insight", "") for s in recent_suggestions]
+        if not ideas:
+            return []
+        
+        if known is None:
+            known = await self.get_known_insights()
+        
+        ideas = await self._drop_known_duplicates(ideas, known)
+        if not ideas:
+            return []
+        
+        insights = [idea.core_insight for idea in ideas]
+        prompt = self._filter_prompt(insights, known.prompt_text(), summary)
+        checks = await self._arun_checks(prompt, insights)
+        if checks is None:
+            # Err on the side of caution
+            return []
         
         filtered = []
-        for idea in ideas:
-            # Check for duplicates
-            if self.check_duplicate(idea.core_insight, existing_insights):
-                continue
-            
-            # Check for sensitivity
-            if self.check_sensitivity(idea.core_insight, summary):
+        for idea, check in zip(ideas, checks):
+            if check["is_duplicate"] or check["is_sensitive"]:
                 continue
             
             filtered.append(idea)
-            # Add to existing for cross-checking within batch
-            existing_insights.append(idea.core_insight)
+            # Add to known for cross-checking later batches
+            known.add(idea.core_insight)
         
         return filtered
 
 
 # Singleton instance
-_detector: Optional[DetectorService] = None
-
+@lru_cache(maxsize=1)
 def get_detector() -> DetectorService:
     """Get detector service singleton."""
-    global _detector
-    if _detector is None:
-        _detector = DetectorService()
-    return _detector
+    return DetectorService()
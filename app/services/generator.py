@@ -3,20 +3,43 @@ Content generation service for Chorus bot.
 Generates platform-specific post drafts.
 """
 import logging
-from typing import Optional
+import re
+from functools import lru_cache
 
 from app.models import PostIdea, GeneratedContent, Suggestion, SuggestionStatus
 from app.database import get_database
 from app.services.llm import get_llm
-from app.prompts.templates import (
-    LINKEDIN_PROMPT,
-    X_POST_PROMPT,
-    REWRITE_LINKEDIN_PROMPT,
-    REWRITE_X_PROMPT
-)
+from app.services.detector import insight_fingerprint
+from app.prompts.templates import COMBINED_POST_PROMPT, COMBINED_REWRITE_PROMPT
 
 logger = logging.getLogger(__name__)
 
+# Draft cleanup patterns, compiled once at import
+_EMOJI_RE = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs
+    "\U0001F680-\U0001F6FF"  # transport & map symbols
+    "\U0001F1E0-\U0001F1FF"  # flags
+    "\U00002702-\U000027B0"
+    "\U000024C2-\U0001F251"
+    "]+",
+    flags=re.UNICODE
+)
+_HASHTAG_RE = re.compile(r'#\w+')
+_HASHTAG_WS_RE = re.compile(r'#\w+\s*')
+_WS_RE = re.compile(r'\n{3,}')
+
+# Output budget for a LinkedIn + X draft pair (1000 + 100 when generated apart)
+_DRAFTS_MAX_TOKENS = 1100
+
+
+def _strip_emojis(draft: str) -> str:
+    """Remove emojis; pure-ASCII drafts can't contain any, so skip the regex."""
+    if draft.isascii():
+        return draft
+    return _EMOJI_RE.sub('', draft)
+
 
 class GeneratorService:
     """
@@ -37,91 +60,78 @@ class GeneratorService:
         self.db = get_database()
         self.llm = get_llm()
     
-    def generate_linkedin_post(
+    async def agenerate_content(
         self, 
         idea: PostIdea, 
         summary: str
-    ) -> str:
-        """Generate a LinkedIn post draft."""
-        prompt = LINKEDIN_PROMPT.format(
-            core_insight=idea.core_insight,
-            why_it_works=idea.why_it_works,
-            summary=summary
-        )
+    ) -> GeneratedContent:
+        """Generate both LinkedIn and X drafts for an idea in one LLM call."""
+        prompt = self._content_prompt(idea, summary)
         
         try:
-            draft = self.llm.complete(prompt, temperature=0.7, max_tokens=1000)
-            return self._clean_linkedin_draft(draft)
+            result = await self.llm.acomplete_json(prompt, temperature=0.75, max_tokens=_DRAFTS_MAX_TOKENS)
         except Exception as e:
-            logger.error(f"Failed to generate LinkedIn post: {e}")
-            return ""
-    
-    def generate_x_post(self, idea: PostIdea) -> str:
-        """Generate an X/Twitter post draft."""
-        prompt = X_POST_PROMPT.format(core_insight=idea.core_insight)
+            logger.error(f"Failed to generate content: {e}")
+            result = {}
         
-        try:
-            draft = self.llm.complete(prompt, temperature=0.8, max_tokens=100)
-            return self._clean_x_draft(draft)
-        except Exception as e:
-            logger.error(f"Failed to generate X post: {e}")
-            return ""
+        return self._build_content(idea, result)
     
-    def generate_content(
-        self, 
-        idea: PostIdea, 
-        summary: str
-    ) -> GeneratedContent:
-        """Generate both LinkedIn and X drafts for an idea."""
-        linkedin_draft = self.generate_linkedin_post(idea, summary)
-        x_draft = self.generate_x_post(idea)
-        
+    def _content_prompt(self, idea: PostIdea, summary: str) -> str:
+        """Format the combined LinkedIn + X prompt for an idea."""
+        return COMBINED_POST_PROMPT.format(
+            core_insight=idea.core_insight,
+            why_it_works=idea.why_it_works,
+            summary=summary
+        )
+    
+    def _build_content(self, idea: PostIdea, result: dict) -> GeneratedContent:
+        """Clean the drafts in an LLM response into GeneratedContent."""
         return GeneratedContent(
             core_insight=idea.core_insight,
             why_it_works=idea.why_it_works,
-            linkedin_draft=linkedin_draft,
-            x_draft=x_draft
+            linkedin_draft=self._clean_linkedin_draft(result.get("linkedin_draft", "")),
+            x_draft=self._clean_x_draft(result.get("x_draft", ""))
         )
     
-    def rewrite_linkedin(
+    async def arewrite_content(
         self, 
-        original_draft: str, 
+        original_linkedin: str, 
+        original_x: str, 
         core_insight: str, 
         summary: str
-    ) -> str:
-        """Rewrite a LinkedIn post with a fresh angle."""
-        prompt = REWRITE_LINKEDIN_PROMPT.format(
-            original_draft=original_draft,
+    ) -> tuple[str, str]:
+        """
+        Rewrite both drafts with a fresh angle in one LLM call.
+        
+        Returns (linkedin_draft, x_draft); originals are kept on failure.
+        """
+        prompt = COMBINED_REWRITE_PROMPT.format(
+            original_linkedin=original_linkedin,
+            original_x=original_x,
             core_insight=core_insight,
             summary=summary
         )
         
         try:
-            draft = self.llm.complete(prompt, temperature=0.8, max_tokens=1000)
-            return self._clean_linkedin_draft(draft)
+            result = await self.llm.acomplete_json(prompt, temperature=0.85, max_tokens=_DRAFTS_MAX_TOKENS)
         except Exception as e:
-            logger.error(f"Failed to rewrite LinkedIn post: {e}")
-            return original_draft
+            logger.error(f"Failed to rewrite content: {e}")
+            return original_linkedin, original_x
+        
+        return self._pick_rewrites(result, original_linkedin, original_x)
     
-    def rewrite_x(
+    def _pick_rewrites(
         self, 
-        original_draft: str, 
-        core_insight: str
-    ) -> str:
-        """Rewrite an X post with a fresh angle."""
-        prompt = REWRITE_X_PROMPT.format(
-            original_draft=original_draft,
-            core_insight=core_insight
-        )
-        
-        try:
-            draft = self.llm.complete(prompt, temperature=0.9, max_tokens=100)
-            return self._clean_x_draft(draft)
-        except Exception as e:
-            logger.error(f"Failed to rewrite X post: {e}")
-            return original_draft
+        result: dict, 
+        original_linkedin: str, 
+        original_x: str
+    ) -> tuple[str, str]:
+        """Clean rewritten drafts, falling back to the originals when empty."""
+        linkedin_draft = self._clean_linkedin_draft(result.get("linkedin_draft", ""))
+        x_draft = self._clean_x_draft(result.get("x_draft", ""))
+        return linkedin_draft or original_linkedin, x_draft or original_x
     
-    def save_suggestion(
+    async def save_suggestion(
         self, 
         content: GeneratedContent, 
         summary_id: str
@@ -132,55 +142,31 @@ class GeneratorService:
             insight=content.core_insight,
             linkedin_draft=content.linkedin_draft,
             x_draft=content.x_draft,
-            status=SuggestionStatus.PENDING
+            status=SuggestionStatus.PENDING,
+            fingerprint=insight_fingerprint(content.core_insight)
         )
-        return self.db.save_suggestion(suggestion)
+        return await self.db.save_suggestion(suggestion)
     
     def _clean_linkedin_draft(self, draft: str) -> str:
         """Clean up LinkedIn draft."""
         # Remove any accidental emojis
-        import re
-        emoji_pattern = re.compile(
-            "["
-            "\U0001F600-\U0001F64F"  # emoticons
-            "\U0001F300-\U0001F5FF"  # symbols & pictographs
-            "\U0001F680-\U0001F6FF"  # transport & map symbols
-            "\U0001F1E0-\U0001F1FF"  # flags
-            "\U00002702-\U000027B0"
-            "\U000024C2-\U0001F251"
-            "]+",
-            flags=re.UNICODE
-        )
-        draft = emoji_pattern.sub('', draft)
+        draft = _strip_emojis(draft)
         
         # Remove hashtags
-        draft = re.sub(r'#\w+', '', draft)
+        draft = _HASHTAG_RE.sub('', draft)
         
         # Clean up extra whitespace
-        draft = re.sub(r'\n{3,}', '\n\n', draft)
+        draft = _WS_RE.sub('\n\n', draft)
         
         return draft.strip()
     
     def _clean_x_draft(self, draft: str) -> str:
         """Clean up X draft."""
-        import re
-        
         # Remove hashtags (unless it feels essential)
-        draft = re.sub(r'#\w+\s*', '', draft)
+        draft = _HASHTAG_WS_RE.sub('', draft)
         
         # Remove emojis
-        emoji_pattern = re.compile(
-            "["
-            "\U0001F600-\U0001F64F"
-            "\U0001F300-\U0001F5FF"
-            "\U0001F680-\U0001F6FF"
-            "\U0001F1E0-\U0001F1FF"
-            "\U00002702-\U000027B0"
-            "\U000024C2-\U0001F251"
-            "]+",
-            flags=re.UNICODE
-        )
-        draft = emoji_pattern.sub('', draft)
+        draft = _strip_emojis(draft)
         
         # Ensure under 280 chars
         if len(draft) > 280:
@@ -190,11 +176,7 @@ class GeneratorService:
 
 
 # Singleton instance
-_generator: Optional[GeneratorService] = None
-
+@lru_cache(maxsize=1)
 def get_generator() -> GeneratorService:
     """Get generator service singleton."""
-    global _generator
-    if _generator is None:
-        _generator = GeneratorService()
-    return _generator
+    return GeneratorService()
@@ -1,9 +1,11 @@
 """
 OpenAI LLM client wrapper for Chorus bot.
 """
-from openai import OpenAI
-import json
-from typing import Optional
+from openai import AsyncOpenAI
+import httpx
+import orjson
+import tiktoken
+from functools import lru_cache
 
 from app.config import get_settings
 from app.prompts.templates import SYSTEM_PROMPT
@@ -14,54 +16,70 @@ class LLMClient:
     
     def __init__(self):
         settings = get_settings()
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        
+        # The client sits on a pooled httpx client built once, so calls
+        # share keep-alive connections instead of re-handshaking
+        limits = httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive_connections
+        )
+        timeout = httpx.Timeout(
+            settings.openai_timeout_seconds, 
+            connect=5.0, 
+            write=10.0, 
+            pool=5.0
+        )
+        self._http = httpx.AsyncClient(limits=limits, timeout=timeout)
+        
+        self.aclient = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            max_retries=settings.openai_max_retries,
+            http_client=self._http
+        )
         self.model = settings.openai_model
+        self._encoding = None
     
-    def complete(
-        self, 
-        prompt: str, 
-        system_prompt: str = SYSTEM_PROMPT,
-        temperature: float = 0.7,
-        max_tokens: int = 2000
-    ) -> str:
-        """Get a completion from the LLM."""
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
-        return response.choices[0].message.content.strip()
+    def _messages(self, prompt: str, system_prompt: str) -> list[dict]:
+        """Build the chat messages for a prompt."""
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
     
-    def complete_json(
+    def count_tokens(self, text: str) -> int:
+        """Count the tokens text uses with the configured model's encoding."""
+        if self._encoding is None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(self.model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("o200k_base")
+        return len(self._encoding.encode(text))
+    
+    async def acomplete_json(
         self, 
         prompt: str, 
         system_prompt: str = SYSTEM_PROMPT,
-        temperature: float = 0.3
+        temperature: float = 0.3,
+        max_tokens: int = 600
     ) -> dict:
         """Get a JSON response from the LLM."""
-        response = self.client.chat.completions.create(
+        response = await self.aclient.chat.completions.create(
             model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
+            messages=self._messages(prompt, system_prompt),
             temperature=temperature,
+            max_tokens=max_tokens,
             response_format={"type": "json_object"}
         )
         content = response.choices[0].message.content.strip()
-        return json.loads(content)
+        return orjson.loads(content)
+    
+    async def close(self):
+        """Close the pooled HTTP client."""
+        await self._http.aclose()
 
 
 # Singleton instance
-_llm: Optional[LLMClient] = None
-
+@lru_cache(maxsize=1)
 def get_llm() -> LLMClient:
     """Get LLM client singleton."""
-    global _llm
-    if _llm is None:
-        _llm = LLMClient()
-    return _llm
+    return LLMClient()
@@ -2,16 +2,18 @@
 Content pipeline orchestrator for Chorus bot.
 Coordinates the full flow from messages to suggestions.
 """
+import asyncio
 import logging
+from functools import lru_cache
 from typing import Optional
 from datetime import datetime
 
 from app.config import get_settings
-from app.models import ConversationSummary, GeneratedContent
+from app.models import ConversationSummary, GeneratedContent, SlackMessage
 from app.database import get_database
 from app.services.buffer import get_buffer_service
 from app.services.summarizer import get_summarizer
-from app.services.detector import get_detector
+from app.services.detector import get_detector, KnownInsights
 from app.services.generator import get_generator
 
 logger = logging.getLogger(__name__)
@@ -36,70 +38,112 @@ class ContentPipeline:
         self.summarizer = get_summarizer()
         self.detector = get_detector()
         self.generator = get_generator()
+        # Caps how many channels hit the LLM at once
+        self._sem = asyncio.Semaphore(self.settings.pipeline_concurrency)
+        # Serializes the daily limit check with the save that follows it
+        self._save_lock = asyncio.Lock()
     
-    async def process_channel(self, channel_id: str) -> list[dict]:
+    async def process_channel(
+        self, 
+        channel_id: str, 
+        messages_in_buffer: Optional[list[SlackMessage]] = None,
+        known_insights: Optional[KnownInsights] = None
+    ) -> list[dict]:
         """
         Process a single channel through the full pipeline.
         
+        Pass messages_in_buffer when the channel's buffer was prefetched,
+        and known_insights to share one dedup set across channels.
         Returns list of created suggestion records.
         """
-        results = []
+        messages = await self._prepare_channel(channel_id, messages_in_buffer)
+        if not messages:
+            return []
         
+        return await self._summarize_and_process(channel_id, messages, None, known_insights)
+    
+    async def _prepare_channel(
+        self, 
+        channel_id: str, 
+        messages_in_buffer: Optional[list[SlackMessage]]
+    ) -> Optional[list[SlackMessage]]:
+        """Return the messages to summarize if the channel is ready, else None."""
         # Get message count for logging
-        messages_in_buffer = self.buffer_service.get_buffer_from_db(channel_id)
+        if messages_in_buffer is None:
+            messages_in_buffer = await self.buffer_service.get_buffer_from_db(channel_id)
         logger.info(f"Channel {channel_id}: {len(messages_in_buffer)} messages in buffer "
                    f"(need {self.settings.min_messages_for_summary} to summarize)")
         
         # Check if we should process
-        if not self.buffer_service.should_summarize(channel_id):
+        if not await self.buffer_service.should_summarize(channel_id, len(messages_in_buffer)):
             logger.info(f"Channel {channel_id} not ready - need more messages or time")
-            return results
+            return None
         
         # Check daily suggestion limit
-        suggestions_today = self.db.get_suggestions_today()
-        if len(suggestions_today) >= self.settings.max_suggestions_per_day:
+        if await self.db.count_suggestions_today() >= self.settings.max_suggestions_per_day:
             logger.info("Daily suggestion limit reached")
-            return results
+            return None
         
-        # Step 1: Get messages and summarize
-        messages = self.buffer_service.get_messages_for_summary(channel_id)
-        if not messages:
-            return results
+        messages = await self.buffer_service.get_messages_for_summary(
+            channel_id, 
+            messages_in_buffer
+        )
+        return messages or None
+    
+    async def _summarize_and_process(
+        self, 
+        channel_id: str, 
+        messages: list[SlackMessage],
+        summary: Optional[ConversationSummary],
+        known_insights: Optional[KnownInsights]
+    ) -> list[dict]:
+        """
+        Run a ready channel from summary to saved suggestions.
+        
+        Pass the summary when it was already made by a batch call;
+        without one the channel is summarized on its own.
+        """
+        async with self._sem:
+            if summary is None:
+                summary = await self.summarizer.asummarize_conversation(messages)
+            return await self._process_summary(channel_id, messages, summary, known_insights)
+    
+    async def _process_summary(
+        self, 
+        channel_id: str, 
+        messages: list[SlackMessage],
+        summary: Optional[ConversationSummary],
+        known_insights: Optional[KnownInsights]
+    ) -> list[dict]:
+        """Pipeline body after summarization; callers hold the semaphore."""
+        results = []
         
-        summary = self.summarizer.summarize_conversation(messages)
         if not summary or not summary.summary:
             logger.info(f"No meaningful summary for channel {channel_id}")
             self.buffer_service.clear_buffer(channel_id)
             return results
         
-        # Save summary
-        from app.models import SummaryMetadata
-        metadata = SummaryMetadata(
-            key_ideas=summary.key_ideas,
-            opinions=summary.opinions,
-            decisions=summary.decisions,
-            interesting_phrases=summary.interesting_phrases,
-            message_count=len(messages),
-            window_start=messages[0].timestamp,
-            window_end=messages[-1].timestamp
-        )
-        summary_record = self.db.save_summary(channel_id, summary.summary, metadata)
-        summary_id = summary_record.get("id")
-        
         # Clear buffer
         self.buffer_service.clear_buffer(channel_id)
         
-        # Step 2: Detect post-worthy insights
-        detection = self.detector.detect_post_worthy(summary)
+        # Save summary and Step 2: detect post-worthy insights. Detection
+        # only needs the summary in memory, so the insert runs alongside it.
+        metadata = self.summarizer.build_metadata(summary, messages)
+        summary_record, detection = await asyncio.gather(
+            self.db.save_summary(channel_id, summary.summary, metadata),
+            self.detector.adetect_post_worthy(summary)
+        )
+        summary_id = summary_record.get("id")
         
         if not detection.is_post_worthy or not detection.ideas:
             logger.info(f"No post-worthy insights in channel {channel_id}")
             return results
         
         # Step 3: Filter ideas (dedup + sensitivity)
-        filtered_ideas = self.detector.filter_ideas(
+        filtered_ideas = await self.detector.filter_ideas(
             detection.ideas, 
-            summary.summary
+            summary.summary,
+            known_insights
         )
         
         if not filtered_ideas:
@@ -107,19 +151,35 @@ class ContentPipeline:
             return results
         
         # Step 4: Generate content for each idea (respect daily limit)
-        remaining_slots = self.settings.max_suggestions_per_day - len(suggestions_today)
+        suggestions_today = await self.db.count_suggestions_today()
+        remaining_slots = self.settings.max_suggestions_per_day - suggestions_today
+        if remaining_slots <= 0:
+            logger.info("Daily suggestion limit reached")
+            return results
         ideas_to_process = filtered_ideas[:remaining_slots]
         
-        for idea in ideas_to_process:
-            # Generate drafts
-            content = self.generator.generate_content(idea, summary.summary)
+        # Generate drafts for all ideas concurrently
+        contents = await asyncio.gather(
+            *(self.generator.agenerate_content(idea, summary.summary) for idea in ideas_to_process),
+            return_exceptions=True
+        )
+        
+        for idea, content in zip(ideas_to_process, contents):
+            if isinstance(content, Exception):
+                logger.error(f"Failed to generate content for insight: {idea.core_insight[:50]}: {content}")
+                continue
             
             if not content.linkedin_draft or not content.x_draft:
                 logger.warning(f"Failed to generate content for insight: {idea.core_insight[:50]}")
                 continue
             
-            # Save suggestion
-            saved = self.generator.save_suggestion(content, summary_id)
+            # Save suggestion, re-checking the limit since other channels
+            # may have saved suggestions while this one was generating
+            async with self._save_lock:
+                if await self.db.count_suggestions_today() >= self.settings.max_suggestions_per_day:
+                    logger.info("Daily suggestion limit reached")
+                    break
+                saved = await self.generator.save_suggestion(content, summary_id)
             saved["content"] = content  # Attach for delivery
             results.append(saved)
             
@@ -131,34 +191,67 @@ class ContentPipeline:
         """
         Process all listening channels.
         
+        Ready channels are summarized together via batch_summarize;
+        any channel the batch couldn't summarize falls back to its own call.
         Returns all created suggestions.
         """
-        all_results = []
-        channels = self.db.get_listening_channels()
+        channels = await self.db.get_listening_channels()
+        
+        # One query returns the buffers of channels at the message threshold.
+        # Channels left out can only be ready through the in-memory time
+        # trigger, which _prepare_channel checks without another query.
+        buffers = await self.buffer_service.get_buffers_from_db(
+            self.settings.min_messages_for_summary
+        )
+        
+        prepared = await asyncio.gather(
+            *(self._prepare_channel(channel_id, buffers.get(channel_id, [])) 
+              for channel_id in channels),
+            return_exceptions=True
+        )
+        ready = []
+        for channel_id, messages in zip(channels, prepared):
+            if isinstance(messages, Exception):
+                logger.error(f"Failed to process channel {channel_id}: {messages}")
+            elif messages:
+                ready.append((channel_id, messages))
+        
+        if not ready:
+            return []
         
-        for channel_id in channels:
-            try:
-                results = await self.process_channel(channel_id)
-                all_results.extend(results)
-            except Exception as e:
-                logger.error(f"Failed to process channel {channel_id}: {e}")
+        try:
+            summaries = await self.summarizer.batch_summarize(ready)
+        except Exception as e:
+            logger.error(f"Failed to batch summarize {len(ready)} channel(s): {e}")
+            summaries = {}
+        
+        # Fetched once per run and shared, so channels also dedup
+        # against ideas accepted elsewhere in this run
+        known_insights = await self.detector.get_known_insights()
+        
+        # Channels run concurrently, bounded by the semaphore
+        outcomes = await asyncio.gather(
+            *(self._summarize_and_process(
+                channel_id, 
+                messages, 
+                summaries.get(channel_id), 
+                known_insights
+            ) for channel_id, messages in ready),
+            return_exceptions=True
+        )
+        
+        all_results = []
+        for (channel_id, _), outcome in zip(ready, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Failed to process channel {channel_id}: {outcome}")
+                continue
+            all_results.extend(outcome)
         
         return all_results
-    
-    def run_sync(self) -> list[dict]:
-        """
-        Synchronous version for background jobs.
-        """
-        import asyncio
-        return asyncio.run(self.process_all_channels())
 
 
 # Singleton instance
-_pipeline: Optional[ContentPipeline] = None
-
+@lru_cache(maxsize=1)
 def get_pipeline() -> ContentPipeline:
     """Get pipeline singleton."""
-    global _pipeline
-    if _pipeline is None:
-        _pipeline = ContentPipeline()
-    return _pipeline
+    return ContentPipeline()
@@ -2,17 +2,23 @@
 Conversation summarization service for Chorus bot.
 """
 from datetime import datetime
+import asyncio
 import logging
+from functools import lru_cache
 from typing import Optional
 
+from app.config import get_settings
 from app.models import SlackMessage, ConversationSummary, SummaryMetadata
 from app.database import get_database
 from app.services.llm import get_llm
 from app.services.buffer import get_buffer_service
-from app.prompts.templates import SUMMARIZER_PROMPT
+from app.prompts.templates import SUMMARIZER_PROMPT, BATCH_SUMMARIZER_PROMPT
 
 logger = logging.getLogger(__name__)
 
+# Output budget for one conversation's summary JSON
+_SUMMARY_MAX_TOKENS = 800
+
 
 class SummarizerService:
     """
@@ -22,84 +28,254 @@ class SummarizerService:
     """
     
     def __init__(self):
+        self.settings = get_settings()
         self.db = get_database()
         self.llm = get_llm()
         self.buffer_service = get_buffer_service()
     
-    def summarize_conversation(
+    async def asummarize_conversation(
         self, 
-        messages: list[SlackMessage]
+        messages: list[SlackMessage],
+        formatted: Optional[str] = None
     ) -> Optional[ConversationSummary]:
         """
         Summarize a conversation and extract insights.
         
+        Pass formatted when the messages were already formatted for the LLM.
         Returns None if conversation is too casual or empty.
         """
-        if not messages:
-            logger.warning("No messages to summarize")
+        built = self._build_prompt(messages, formatted)
+        if built is None:
             return None
+        prompt, dropped = built
         
-        # Format messages for LLM
-        formatted = self.buffer_service.format_messages_for_llm(messages)
+        try:
+            result = await self.llm.acomplete_json(prompt, temperature=0.3, max_tokens=_SUMMARY_MAX_TOKENS)
+            return self._parse_summary(result, dropped)
+        except Exception as e:
+            logger.error(f"Failed to summarize conversation: {e}")
+            return None
+    
+    async def batch_summarize(
+        self, 
+        channels_and_messages: list[tuple[str, list[SlackMessage]]]
+    ) -> dict[str, ConversationSummary]:
+        """
+        Summarize several channels' conversations with as few LLM calls as possible.
         
-        # Build prompt
-        prompt = SUMMARIZER_PROMPT.format(messages=formatted)
+        Conversations are packed greedily into batches of up to
+        summary_batch_size, within summary_batch_max_tokens. A conversation
+        over the budget is summarized on its own. Channels whose summary
+        failed are missing from the result.
+        """
+        max_tokens = self.settings.summary_batch_max_tokens
+        packs: list[list[tuple[str, str]]] = []
+        pack: list[tuple[str, str]] = []
+        pack_tokens = 0
+        oversized: list[tuple[str, list[SlackMessage], str]] = []
         
-        try:
-            # Get LLM response
-            result = self.llm.complete_json(prompt, temperature=0.3)
+        for channel_id, messages in channels_and_messages:
+            if not messages:
+                continue
             
-            summary = ConversationSummary(
-                summary=result.get("summary", ""),
-                key_ideas=result.get("key_ideas", []),
-                opinions=result.get("opinions", []),
-                decisions=result.get("decisions", []),
-                interesting_phrases=result.get("interesting_phrases", [])
-            )
+            formatted = self.buffer_service.format_messages_for_llm(messages)
+            tokens = self.llm.count_tokens(formatted)
+            
+            if tokens > max_tokens:
+                oversized.append((channel_id, messages, formatted))
+                continue
             
-            logger.info(f"Generated summary with {len(summary.key_ideas)} key ideas")
-            return summary
+            if pack and (pack_tokens + tokens > max_tokens 
+                         or len(pack) >= self.settings.summary_batch_size):
+                packs.append(pack)
+                pack, pack_tokens = [], 0
             
+            pack.append((channel_id, formatted))
+            pack_tokens += tokens
+        
+        if pack:
+            packs.append(pack)
+        
+        # Oversized conversations and packs are independent LLM calls, run
+        # concurrently under the same bound as the pipeline's channels
+        slots = asyncio.Semaphore(self.settings.pipeline_concurrency)
+        
+        async def summarize_one(channel_id, messages, formatted):
+            async with slots:
+                summary = await self.asummarize_conversation(messages, formatted)
+            return {channel_id: summary} if summary else {}
+        
+        async def summarize_pack(pack):
+            async with slots:
+                return await self._summarize_pack(pack)
+        
+        results = await asyncio.gather(
+            *(summarize_one(*item) for item in oversized),
+            *(summarize_pack(pack) for pack in packs)
+        )
+        
+        summaries = {}
+        for result in results:
+            summaries.update(result)
+        return summaries
+    
+    async def _summarize_pack(
+        self, 
+        pack: list[tuple[str, str]]
+    ) -> dict[str, ConversationSummary]:
+        """Summarize one pack of (channel_id, formatted messages) in one call."""
+        prompt = BATCH_SUMMARIZER_PROMPT.format(
+            conversations="\n\n".join(
+                f"Conversation {n}:\n{formatted}" 
+                for n, (_, formatted) in enumerate(pack, 1)
+            )
+        )
+        
+        try:
+            result = await self.llm.acomplete_json(
+                prompt, 
+                temperature=0.3, 
+                max_tokens=_SUMMARY_MAX_TOKENS * len(pack)
+            )
         except Exception as e:
-            logger.error(f"Failed to summarize conversation: {e}")
+            logger.error(f"Failed to batch summarize {len(pack)} conversations: {e}")
+            return {}
+        
+        summaries = {}
+        for item in result.get("summaries", []):
+            try:
+                n = int(item.get("id"))
+            except (TypeError, ValueError):
+                continue
+            if not 1 <= n <= len(pack):
+                continue
+            
+            channel_id = pack[n - 1][0]
+            try:
+                summaries[channel_id] = self._parse_summary(item)
+            except Exception as e:
+                # Left out, so only this channel falls back to its own call
+                logger.error(f"Invalid batch summary for channel {channel_id}: {e}")
+        
+        return summaries
+    
+    def _build_prompt(
+        self, 
+        messages: list[SlackMessage], 
+        formatted: Optional[str] = None
+    ) -> Optional[tuple[str, int]]:
+        """
+        Build the summarizer prompt.
+        
+        Returns (prompt, dropped message count), or None if there is
+        nothing to summarize.
+        """
+        if not messages:
+            logger.warning("No messages to summarize")
             return None
+        
+        # Format messages for LLM
+        formatted, dropped = self._fit_to_budget(messages, formatted)
+        return SUMMARIZER_PROMPT.format(messages=formatted), dropped
     
-    def process_channel(self, channel_id: str) -> Optional[dict]:
+    def _fit_to_budget(
+        self, 
+        messages: list[SlackMessage], 
+        formatted: Optional[str] = None
+    ) -> tuple[str, int]:
+        """
+        Format messages within summary_token_budget, dropping the oldest first.
+        
+        Returns (formatted text, dropped message count).
+        """
+        budget = self.settings.summary_token_budget
+        if formatted is None:
+            formatted = self.buffer_service.format_messages_for_llm(messages)
+        if self.llm.count_tokens(formatted) <= budget:
+            return formatted, 0
+        
+        lines = [self.buffer_service.format_message(msg) for msg in messages]
+        # +1 for the joining newline
+        counts = [self.llm.count_tokens(line) + 1 for line in lines]
+        total = sum(counts)
+        dropped = 0
+        while total > budget and dropped < len(lines) - 1:
+            total -= counts[dropped]
+            dropped += 1
+        
+        logger.warning(f"Dropped {dropped} oldest of {len(messages)} messages "
+                       f"to fit the {budget}-token summary budget")
+        return "\n".join(lines[dropped:]), dropped
+    
+    def _parse_summary(self, result: dict, dropped: int = 0) -> ConversationSummary:
+        """Build a ConversationSummary from the LLM's JSON response."""
+        summary = ConversationSummary(
+            summary=result.get("summary", ""),
+            key_ideas=result.get("key_ideas", []),
+            opinions=result.get("opinions", []),
+            decisions=result.get("decisions", []),
+            interesting_phrases=result.get("interesting_phrases", []),
+            dropped_message_count=dropped
+        )
+        
+        logger.info(f"Generated summary with {len(summary.key_ideas)} key ideas")
+        return summary
+    
+    def build_metadata(
+        self, 
+        summary: ConversationSummary, 
+        messages: list[SlackMessage]
+    ) -> SummaryMetadata:
+        """Build the metadata saved alongside a summary of messages."""
+        return SummaryMetadata(
+            key_ideas=summary.key_ideas,
+            opinions=summary.opinions,
+            decisions=summary.decisions,
+            interesting_phrases=summary.interesting_phrases,
+            message_count=len(messages),
+            window_start=messages[0].timestamp,
+            window_end=messages[-1].timestamp,
+            dropped_message_count=summary.dropped_message_count
+        )
+    
+    async def process_channel(self, channel_id: str) -> Optional[dict]:
         """
         Process a channel's buffer and create a summary.
         
         Returns the saved summary record or None.
         """
         # Check if should summarize
-        if not self.buffer_service.should_summarize(channel_id):
+        if not await self.buffer_service.should_summarize(channel_id):
             logger.debug(f"Channel {channel_id} not ready for summarization")
             return None
         
         # Get messages
-        messages = self.buffer_service.get_messages_for_summary(channel_id)
+        messages = await self.buffer_service.get_messages_for_summary(channel_id)
         if not messages:
             return None
         
         # Generate summary
-        summary = self.summarize_conversation(messages)
+        summary = await self.asummarize_conversation(messages)
+        return await self._save_summary(channel_id, summary, messages)
+    
+    async def _save_summary(
+        self, 
+        channel_id: str, 
+        summary: Optional[ConversationSummary], 
+        messages: list[SlackMessage]
+    ) -> Optional[dict]:
+        """Save a channel's summary and clear its buffer."""
         if not summary or not summary.summary:
             logger.info(f"No meaningful summary generated for channel {channel_id}")
             self.buffer_service.clear_buffer(channel_id)
             return None
         
-        # Create metadata
-        metadata = SummaryMetadata(
-            key_ideas=summary.key_ideas,
-            opinions=summary.opinions,
-            decisions=summary.decisions,
-            interesting_phrases=summary.interesting_phrases,
-            message_count=len(messages),
-            window_start=messages[0].timestamp,
-            window_end=messages[-1].timestamp
-        )
-        
         # Save to database
-        saved = self.db.save_summary(channel_id, summary.summary, metadata)
+        saved = await self.db.save_summary(
+            channel_id, 
+            summary.summary, 
+            self.build_metadata(summary, messages)
+        )
         
         # Clear buffer
         self.buffer_service.clear_buffer(channel_id)
@@ -107,25 +283,38 @@ class SummarizerService:
         logger.info(f"Saved summary for channel {channel_id}: {saved.get('id')}")
         return saved
     
-    def process_all_channels(self) -> list[dict]:
-        """Process all listening channels."""
-        channels = self.db.get_listening_channels()
-        results = []
+    async def process_all_channels(self) -> list[dict]:
+        """
+        Process all listening channels.
+        
+        Ready channels are summarized together via batch_summarize.
+        """
+        channels = await self.db.get_listening_channels()
+        
+        ready_flags = await asyncio.gather(
+            *(self.buffer_service.should_summarize(channel_id) for channel_id in channels)
+        )
+        candidates = [c for c, is_ready in zip(channels, ready_flags) if is_ready]
         
-        for channel_id in channels:
-            result = self.process_channel(channel_id)
-            if result:
-                results.append(result)
+        fetched = await asyncio.gather(
+            *(self.buffer_service.get_messages_for_summary(c) for c in candidates)
+        )
+        ready = [(c, messages) for c, messages in zip(candidates, fetched) if messages]
+        
+        if not ready:
+            return []
         
-        return results
+        summaries = await self.batch_summarize(ready)
+        saved = await asyncio.gather(
+            *(self._save_summary(channel_id, summaries.get(channel_id), messages)
+              for channel_id, messages in ready)
+        )
+        
+        return [result for result in saved if result]
 
 
 # Singleton instance
-_summarizer: Optional[SummarizerService] = None
-
+@lru_cache(maxsize=1)
 def get_summarizer() -> SummarizerService:
     """Get summarizer service singleton."""
-    global _summarizer
-    if _summarizer is None:
-        _summarizer = SummarizerService()
-    return _summarizer
+    return SummarizerService()
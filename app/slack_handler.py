@@ -2,9 +2,14 @@
 Slack event handling and bot interactions for Chorus.
 """
 from slack_bolt.async_app import AsyncApp
-from datetime import datetime
+from slack_sdk.errors import SlackApiError
+from collections import OrderedDict
+from datetime import datetime, timezone
+import asyncio
 import logging
 import re
+import threading
+import time
 from typing import Optional
 
 from app.config import get_settings
@@ -17,6 +22,78 @@ from app.services.generator import get_generator
 
 logger = logging.getLogger(__name__)
 
+# Suggestion messages remembered for reaction handling (LRU-evicted)
+_SUGGESTION_MAP_MAX = 10_000
+
+# Reactions that act on a suggestion, mapped to handler methods
+_REACTION_ACTIONS = {
+    "+1": "_save_suggestion",
+    "thumbsup": "_save_suggestion",
+    "arrows_counterclockwise": "_rewrite_suggestion",
+    "repeat": "_rewrite_suggestion",
+    "x": "_ignore_suggestion",
+    "negative_squared_cross_mark": "_ignore_suggestion",
+}
+_HANDLED_REACTIONS = frozenset(_REACTION_ACTIONS)
+
+# Times the outbound sender retries a rate-limited post before giving up
+_RATE_LIMIT_RETRIES = 3
+
+# Seconds a rendered "saved posts" reply is reused
+_SAVED_MSG_TTL = 10
+
+# DM channel IDs remembered per user (LRU-evicted)
+_DM_CHANNEL_CACHE_MAX = 1_000
+
+# DM keywords that must be the whole text, mapped to handler methods
+_STATUS_CMDS = frozenset({"status", "stats", "info"})
+_SAVED_CMDS = frozenset({"saved", "saved posts", "my posts"})
+_DM_COMMANDS = {
+    **dict.fromkeys(_STATUS_CMDS, "_handle_status"),
+    **dict.fromkeys(_SAVED_CMDS, "_handle_show_saved"),
+}
+
+# Command patterns mapped to handler methods, checked in order. Phrase
+# commands match anywhere in the text.
+_DM_DISPATCH = (
+    (re.compile(r"start listening"), "_handle_start_listening"),
+    (re.compile(r"stop listening"), "_handle_stop_listening"),
+)
+
+_MENTION_DISPATCH = (
+    (re.compile(r"start listening"), "_mention_start_listening"),
+    (re.compile(r"stop listening"), "_mention_stop_listening"),
+    (re.compile(r"status"), "_mention_status"),
+)
+
+# Suggestion message per PRD template
+_SUGGESTION_TMPL = """👀 This might be worth posting:
+
+*INSIGHT:*
+{insight}
+
+*Why this works:*
+{why_it_works}
+
+*LinkedIn Draft:*
+---
+{linkedin_draft}
+---
+
+*X Draft:*
+---
+{x_draft}
+---
+
+React with:
+👍 Save   🔁 Rewrite   ❌ Ignore"""
+
+_CHANNEL_PICKER_TMPL = (
+    "Which channel should I listen to?\n\n"
+    "%s\n\n"
+    "Reply with: `listen to #channel-name` or `listen to CHANNEL_ID`"
+)
+
 
 class SlackBot:
     """
@@ -28,6 +105,13 @@ class SlackBot:
     - Handles emoji reactions for feedback
     """
     
+    __slots__ = (
+        "settings", "app", "db", "buffer_service",
+        "_suggestion_message_map", "_dm_channel_cache",
+        "_ingest_q", "_ingest_task", "_outbox_q", "_outbox_task",
+        "_handler_slots", "_saved_msg_cache", "_inflight_rewrites",
+    )
+    
     def __init__(self):
         self.settings = get_settings()
         self.app = AsyncApp(
@@ -37,8 +121,32 @@ class SlackBot:
         self.db = get_database()
         self.buffer_service = get_buffer_service()
         
-        # Store suggestion IDs mapped to Slack message timestamps
-        self._suggestion_message_map: dict[str, str] = {}
+        # Store suggestion IDs mapped to Slack message timestamps,
+        # least recently used first
+        self._suggestion_message_map: OrderedDict[str, str] = OrderedDict()
+        
+        # DM channel IDs by user ID; Slack returns the same one every time
+        self._dm_channel_cache: OrderedDict[str, str] = OrderedDict()
+        
+        # Inbound channel messages, drained in batches by _ingest_loop
+        self._ingest_q: asyncio.Queue[SlackMessage] = asyncio.Queue(maxsize=10_000)
+        self._ingest_task: Optional[asyncio.Task] = None
+        
+        # Outbound chat.postMessage calls, sent one at a time by
+        # _outbox_loop so rate limits back off in one place
+        self._outbox_q: asyncio.Queue[tuple] = asyncio.Queue()
+        self._outbox_task: Optional[asyncio.Task] = None
+        
+        # Bolt acks events up front and runs each listener in its own
+        # task, so this caps how many listeners do work at once
+        self._handler_slots = asyncio.Semaphore(self.settings.slack_handler_concurrency)
+        
+        # Rendered "saved posts" replies by user ID: (rendered_at monotonic, text).
+        # Saved posts aren't per user, so any status change clears them all.
+        self._saved_msg_cache: dict[str, tuple[float, str]] = {}
+        
+        # Rewrites in progress by suggestion ID, so repeat reactions share one
+        self._inflight_rewrites: dict[str, asyncio.Future] = {}
         
         self._register_handlers()
     
@@ -54,101 +162,217 @@ class SlackBot:
         self.app.event("app_mention")(self._handle_mention)
     
     async def _handle_all_messages(self, event: dict, say, client):
-        """Route messages to appropriate handler based on type."""
+        """
+        Route messages to appropriate handler based on type.
+        
+        Channel messages are filtered inline, since most events stop
+        here, then queued for _ingest_loop to buffer in batches.
+        """
+        get = event.get
+        
         # Ignore bot messages
-        if event.get("bot_id") or event.get("subtype") == "bot_message":
+        if get("bot_id") or get("subtype") == "bot_message":
             return
         
         # Route DMs to DM handler
-        if event.get("channel_type") == "im":
-            await self._handle_dm(event, say, client)
-        else:
-            # Route channel messages to channel handler
-            await self._handle_channel_message(event, say, client)
-    
-    async def _handle_channel_message(self, event: dict, say, client):
-        """Handle incoming messages in channels."""
-        # Ignore thread replies (v1)
-        if event.get("thread_ts"):
+        if get("channel_type") == "im":
+            async with self._handler_slots:
+                await self._handle_dm(event, say, client)
             return
         
-        channel_id = event.get("channel")
-        
-        # Check if we're listening to this channel
-        if not self.db.is_listening(channel_id):
+        # Ignore thread replies (v1)
+        if get("thread_ts"):
             return
         
-        # Create message object
+        # Create message object. Slack's ts is the epoch time the message
+        # was posted, so it doubles as the timestamp.
+        ts = get("ts", "")
         message = SlackMessage(
-            message_id=event.get("ts", ""),
-            channel_id=channel_id,
-            user_id=event.get("user", ""),
-            text=event.get("text", ""),
-            timestamp=datetime.utcnow()
+            message_id=ts,
+            channel_id=get("channel"),
+            user_id=get("user", ""),
+            text=get("text", ""),
+            timestamp=datetime.fromtimestamp(float(ts) if ts else time.time(), tz=timezone.utc)
         )
         
-        # Add to buffer
-        self.buffer_service.add_message(message)
-        logger.debug(f"Captured message in channel {channel_id}")
+        self.start_ingest()
+        # Only waits when the queue is full (backpressure)
+        await self._ingest_q.put(message)
+    
+    def start_ingest(self) -> None:
+        """Start the background task that buffers queued channel messages."""
+        if self._ingest_task is None or self._ingest_task.done():
+            self._ingest_task = asyncio.create_task(self._ingest_loop())
+    
+    async def stop_ingest(self) -> None:
+        """Buffer any queued messages and stop the ingest task."""
+        if self._ingest_task is None:
+            return
+        
+        await self._ingest_q.join()
+        self._ingest_task.cancel()
+        try:
+            await self._ingest_task
+        except asyncio.CancelledError:
+            pass
+        self._ingest_task = None
+    
+    async def _ingest_loop(self) -> None:
+        """Drain queued messages in batches of up to 500 or 50 ms."""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._ingest_q.get()]
+            deadline = loop.time() + 0.05
+            
+            while len(batch) < 500:
+                if not self._ingest_q.empty():
+                    batch.append(self._ingest_q.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._ingest_q.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await self._ingest_batch(batch)
+            except Exception as e:
+                logger.error("Failed to ingest %s message(s): %s", len(batch), e)
+            finally:
+                for _ in batch:
+                    self._ingest_q.task_done()
+    
+    async def _ingest_batch(self, batch: list[SlackMessage]) -> None:
+        """Buffer the messages from channels we're listening to."""
+        # One cached lookup filters the whole batch
+        listening = await self.db.listening_channel_set()
+        messages = [m for m in batch if m.channel_id in listening]
+        if messages:
+            self.buffer_service.add_messages(messages)
+    
+    def start_outbox(self) -> None:
+        """Start the background task that sends queued Slack posts."""
+        if self._outbox_task is None or self._outbox_task.done():
+            self._outbox_task = asyncio.create_task(self._outbox_loop())
+    
+    async def stop_outbox(self) -> None:
+        """Send any queued posts and stop the outbox task."""
+        if self._outbox_task is None:
+            return
+        
+        await self._outbox_q.join()
+        self._outbox_task.cancel()
+        try:
+            await self._outbox_task
+        except asyncio.CancelledError:
+            pass
+        self._outbox_task = None
+    
+    async def post_message(self, client, **kwargs):
+        """
+        Queue a chat.postMessage and wait for Slack's response.
+        
+        Raises whatever the post raised once retries are exhausted.
+        """
+        self.start_outbox()
+        future = asyncio.get_running_loop().create_future()
+        await self._outbox_q.put((client, kwargs, future))
+        return await future
+    
+    async def _outbox_loop(self) -> None:
+        """Send queued posts in order, sleeping out rate limits."""
+        while True:
+            client, kwargs, future = await self._outbox_q.get()
+            try:
+                result = await self._send_with_backoff(client, kwargs)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._outbox_q.task_done()
+    
+    async def _send_with_backoff(self, client, kwargs: dict):
+        """Post a message, waiting out Retry-After when rate limited."""
+        for attempt in range(_RATE_LIMIT_RETRIES + 1):
+            try:
+                return await client.chat_postMessage(**kwargs)
+            except SlackApiError as e:
+                if e.response.status_code != 429 or attempt == _RATE_LIMIT_RETRIES:
+                    raise
+                retry_after = e.response.headers.get("Retry-After", 1)
+                if isinstance(retry_after, list):
+                    retry_after = retry_after[0]
+                logger.warning("Rate limited by Slack, retrying in %ss", retry_after)
+                await asyncio.sleep(int(retry_after))
     
     async def _handle_dm(self, event: dict, say, client):
         """Handle direct messages to the bot."""
         text = event.get("text", "").lower().strip()
         user_id = event.get("user")
-        logger.info(f"Processing DM command: '{text}' from user {user_id}")
-        
-        # Handle "start listening" command
-        if "start listening" in text:
-            await self._handle_start_listening(event, say, client)
+        logger.info("Processing DM command: '%.100s' from user %s", text, user_id)
         
-        # Handle "stop listening" command
-        elif "stop listening" in text:
-            await self._handle_stop_listening(event, say, client)
-        
-        # Handle "status" command
-        elif text in ["status", "stats", "info"]:
-            await self._handle_status(event, say)
+        handler_name = _DM_COMMANDS.get(text)
+        if handler_name is None:
+            handler_name = next(
+                (name for pattern, name in _DM_DISPATCH if pattern.search(text)), 
+                None
+            )
         
-        # Handle "saved" command
-        elif text in ["saved", "saved posts", "my posts"]:
-            logger.info("Handling 'saved' command")
-            await self._handle_show_saved(event, say)
+        if handler_name is not None:
+            logger.info("Handling DM command via %s", handler_name)
+            await getattr(self, handler_name)(event, say, client)
+            return
         
-        else:
-            logger.info(f"Unknown DM command: '{text}'")
+        logger.info("Unknown DM command: '%.100s'", text)
     
     async def _handle_mention(self, event: dict, say, client):
         """Handle @Chorus mentions."""
         text = event.get("text", "").lower()
-        channel_id = event.get("channel")
-        user_id = event.get("user")
         
         # Parse command from mention
-        if "start listening" in text:
-            self.db.add_listening_channel(channel_id, user_id)
-            await say(
-                text="👀 Got it! I'm now listening to this channel. "
-                     "I'll stay quiet and only reach out when I spot something worth posting.",
-                channel=channel_id
-            )
-        
-        elif "stop listening" in text:
-            self.db.remove_listening_channel(channel_id)
-            await say(
-                text="Okay, I've stopped listening to this channel.",
-                channel=channel_id
-            )
-        
-        elif "status" in text:
-            channels = self.db.get_listening_channels()
-            suggestions_today = len(self.db.get_suggestions_today())
-            await say(
-                text=f"📊 *Status*\n"
-                     f"• Listening to {len(channels)} channel(s)\n"
-                     f"• {suggestions_today} suggestion(s) today\n"
-                     f"• Max {self.settings.max_suggestions_per_day} suggestions/day",
-                channel=channel_id
-            )
+        for pattern, handler_name in _MENTION_DISPATCH:
+            if pattern.search(text):
+                async with self._handler_slots:
+                    await getattr(self, handler_name)(event, say, client)
+                return
+    
+    async def _mention_start_listening(self, event: dict, say, client):
+        """Handle @Chorus start listening."""
+        channel_id = event.get("channel")
+        await self.db.add_listening_channel(channel_id, event.get("user"))
+        await say(
+            text="👀 Got it! I'm now listening to this channel. "
+                 "I'll stay quiet and only reach out when I spot something worth posting.",
+            channel=channel_id
+        )
+    
+    async def _mention_stop_listening(self, event: dict, say, client):
+        """Handle @Chorus stop listening."""
+        channel_id = event.get("channel")
+        await self.db.remove_listening_channel(channel_id)
+        await say(
+            text="Okay, I've stopped listening to this channel.",
+            channel=channel_id
+        )
+    
+    async def _mention_status(self, event: dict, say, client):
+        """Handle @Chorus status."""
+        channels, suggestions_today = await asyncio.gather(
+            self.db.get_listening_channels(),
+            self.db.count_suggestions_today()
+        )
+        await say(
+            text=f"📊 *Status*\n"
+                 f"• Listening to {len(channels)} channel(s)\n"
+                 f"• {suggestions_today} suggestion(s) today\n"
+                 f"• Max {self.settings.max_suggestions_per_day} suggestions/day",
+            channel=event.get("channel")
+        )
     
     async def _handle_start_listening(self, event: dict, say, client):
         """Handle start listening command via DM."""
@@ -167,19 +391,15 @@ class SlackBot:
                 return
             
             # Create a simple channel picker message
-            channel_list = "\n".join(
-                f"• #{ch['name']} (`{ch['id']}`)" 
+            channel_list = "\n".join([
+                "• #%s (`%s`)" % (ch["name"], ch["id"]) 
                 for ch in channels[:10]
-            )
+            ])
             
-            await say(
-                f"Which channel should I listen to?\n\n"
-                f"{channel_list}\n\n"
-                f"Reply with: `listen to #channel-name` or `listen to CHANNEL_ID`"
-            )
+            await say(_CHANNEL_PICKER_TMPL % channel_list)
             
         except Exception as e:
-            logger.error(f"Failed to list channels: {e}")
+            logger.error("Failed to list channels: %s", e)
             await say(
                 "To start listening, mention me in a channel with:\n"
                 "`@Chorus start listening`"
@@ -187,22 +407,24 @@ class SlackBot:
     
     async def _handle_stop_listening(self, event: dict, say, client):
         """Handle stop listening command via DM."""
-        channels = self.db.get_listening_channels()
+        channels = await self.db.get_listening_channels()
         
         if not channels:
             await say("I'm not currently listening to any channels.")
             return
         
-        for channel_id in channels:
-            self.db.remove_listening_channel(channel_id)
+        await self.db.remove_listening_channels(channels)
         
         await say(f"Stopped listening to {len(channels)} channel(s).")
     
-    async def _handle_status(self, event: dict, say):
+    async def _handle_status(self, event: dict, say, client):
         """Show bot status."""
-        channels = self.db.get_listening_channels()
-        suggestions_today = len(self.db.get_suggestions_today())
-        saved = len(self.db.get_saved_suggestions(limit=100))
+        # Independent lookups, run concurrently
+        channels, suggestions_today, saved = await asyncio.gather(
+            self.db.get_listening_channels(),
+            self.db.count_suggestions_today(),
+            self.db.count_saved_suggestions()
+        )
         
         await say(
             f"📊 *Chorus Status*\n\n"
@@ -211,62 +433,113 @@ class SlackBot:
             f"• {saved} saved posts total"
         )
     
-    async def _handle_show_saved(self, event: dict, say):
-        """Show saved suggestions."""
-        saved = self.db.get_saved_suggestions(limit=5)
+    async def _handle_show_saved(self, event: dict, say, client):
+        """
+        Show saved suggestions.
         
-        if not saved:
-            await say("No saved posts yet. I'll suggest some when I spot good insights!")
+        The reply is cached per user for _SAVED_MSG_TTL seconds, and
+        dropped whenever a reaction changes what is saved.
+        """
+        user_id = event.get("user")
+        cached = self._saved_msg_cache.get(user_id)
+        if cached and time.monotonic() - cached[0] < _SAVED_MSG_TTL:
+            await say(cached[1])
             return
         
-        message = "📚 *Your Saved Posts*\n\n"
-        for i, s in enumerate(saved, 1):
-            insight = s.get("insight", "")[:100]
-            message += f"*{i}.* {insight}...\n\n"
+        saved = await self.db.get_saved_suggestions(limit=5, insight_preview_chars=100)
         
+        if not saved:
+            message = "No saved posts yet. I'll suggest some when I spot good insights!"
+        else:
+            message = "📚 *Your Saved Posts*\n\n"
+            for i, s in enumerate(saved, 1):
+                message += f"*{i}.* {s.get('insight', '')}...\n\n"
+        
+        self._saved_msg_cache[user_id] = (time.monotonic(), message)
         await say(message)
     
     async def _handle_reaction(self, event: dict, client):
         """Handle emoji reactions on suggestions."""
-        reaction = event.get("reaction")
+        # Most reactions aren't ones we act on; drop them before anything else
+        if event.get("reaction") not in _HANDLED_REACTIONS:
+            return
+        
+        async with self._handler_slots:
+            await self._process_reaction(event, client)
+    
+    async def _process_reaction(self, event: dict, client):
+        """Apply a reaction to the suggestion it was left on."""
         item = event.get("item", {})
         message_ts = item.get("ts")
         channel = item.get("channel")
         
         # Find suggestion ID from message timestamp
-        suggestion_id = self._suggestion_message_map.get(message_ts)
+        suggestion_id = await self._lookup_suggestion(channel, message_ts)
         if not suggestion_id:
             return
         
-        if reaction == "+1" or reaction == "thumbsup":
-            # Save the suggestion
-            self.db.update_suggestion_status(
-                suggestion_id, 
-                SuggestionStatus.SAVED
+        handler_name = _REACTION_ACTIONS[event["reaction"]]
+        await getattr(self, handler_name)(suggestion_id, channel, message_ts, client)
+    
+    async def _save_suggestion(
+        self, 
+        suggestion_id: str, 
+        channel: str, 
+        message_ts: str,
+        client
+    ):
+        """Save a suggestion, confirming in the message's thread."""
+        # Save the suggestion while the confirmation is sent
+        status_task = asyncio.create_task(self.db.update_suggestion_status(
+            suggestion_id, 
+            SuggestionStatus.SAVED
+        ))
+        
+        # Send confirmation
+        try:
+            await self.post_message(
+                client,
+                channel=channel,
+                thread_ts=message_ts,
+                text="✅ Saved! Find it anytime with `saved posts`"
             )
-            logger.info(f"Suggestion {suggestion_id} saved")
-            
-            # Send confirmation
+        except Exception as e:
+            logger.error("Failed to send save confirmation: %s", e)
+        
+        try:
+            await status_task
+        except Exception as e:
+            # The confirmation may already be out, so correct it
+            logger.error("Failed to save suggestion %s: %s", suggestion_id, e)
             try:
-                await client.chat_postMessage(
+                await self.post_message(
+                    client,
                     channel=channel,
                     thread_ts=message_ts,
-                    text="✅ Saved! Find it anytime with `saved posts`"
+                    text="⚠️ Sorry, I couldn't save that one. Remove and re-add 👍 to try again."
                 )
             except Exception as e:
-                logger.error(f"Failed to send save confirmation: {e}")
-        
-        elif reaction == "arrows_counterclockwise" or reaction == "repeat":
-            # Rewrite the suggestion
-            await self._rewrite_suggestion(suggestion_id, channel, message_ts, client)
+                logger.error("Failed to send save failure notice: %s", e)
+            return
         
-        elif reaction == "x" or reaction == "negative_squared_cross_mark":
-            # Ignore the suggestion
-            self.db.update_suggestion_status(
-                suggestion_id,
-                SuggestionStatus.IGNORED
-            )
-            logger.info(f"Suggestion {suggestion_id} ignored")
+        self._saved_msg_cache.clear()
+        logger.info("Suggestion %s saved", suggestion_id)
+    
+    async def _ignore_suggestion(
+        self, 
+        suggestion_id: str, 
+        channel: str, 
+        message_ts: str,
+        client
+    ):
+        """Ignore a suggestion."""
+        await self.db.update_suggestion_status(
+            suggestion_id,
+            SuggestionStatus.IGNORED
+        )
+        # It may have been saved before
+        self._saved_msg_cache.clear()
+        logger.info("Suggestion %s ignored", suggestion_id)
     
     async def _rewrite_suggestion(
         self, 
@@ -275,8 +548,29 @@ class SlackBot:
         message_ts: str,
         client
     ):
-        """Rewrite a suggestion with fresh angles."""
-        suggestion = self.db.get_suggestion(suggestion_id)
+        """
+        Rewrite a suggestion with fresh angles.
+        
+        A rewrite already running for the same suggestion is awaited
+        instead of starting another LLM call.
+        """
+        inflight = self._inflight_rewrites.get(suggestion_id)
+        if inflight is not None:
+            logger.info("Rewrite already in progress for suggestion %s", suggestion_id)
+            await asyncio.shield(inflight)
+            return
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight_rewrites[suggestion_id] = future
+        try:
+            await self._do_rewrite(suggestion_id, channel, client)
+        finally:
+            self._inflight_rewrites.pop(suggestion_id, None)
+            future.set_result(None)
+    
+    async def _do_rewrite(self, suggestion_id: str, channel: str, client):
+        """Generate and send fresh drafts for a suggestion."""
+        suggestion = await self.db.get_suggestion(suggestion_id)
         if not suggestion:
             return
         
@@ -290,17 +584,13 @@ class SlackBot:
         generator = get_generator()
         
         # Generate new drafts
-        new_linkedin = generator.rewrite_linkedin(
+        new_linkedin, new_x = await generator.arewrite_content(
             suggestion.get("linkedin_draft", ""),
+            suggestion.get("x_draft", ""),
             suggestion.get("insight", ""),
             ""  # Summary context if available
         )
         
-        new_x = generator.rewrite_x(
-            suggestion.get("x_draft", ""),
-            suggestion.get("insight", "")
-        )
-        
         # Send new suggestion
         await self.send_suggestion(
             channel=channel,
@@ -331,21 +621,67 @@ class SlackBot:
         )
         
         try:
-            result = await client.chat_postMessage(
+            result = await self.post_message(
+                client,
                 channel=channel,
                 text=message,
                 mrkdwn=True
             )
             
-            # Map message timestamp to suggestion ID for reaction handling
-            message_ts = result.get("ts")
-            if message_ts:
-                self._suggestion_message_map[message_ts] = suggestion_id
-            
-            logger.info(f"Sent suggestion {suggestion_id} to channel {channel}")
+            logger.info("Sent suggestion %s to channel %s", suggestion_id, channel)
             
         except Exception as e:
-            logger.error(f"Failed to send suggestion: {e}")
+            logger.error("Failed to send suggestion: %s", e)
+            return
+        
+        # Map message timestamp to suggestion ID for reaction handling,
+        # in memory and in the DB so it survives restarts
+        message_ts = result.get("ts")
+        if not message_ts or not suggestion_id:
+            return
+        self._remember_suggestion(message_ts, suggestion_id)
+        try:
+            await self.db.save_suggestion_message(channel, message_ts, suggestion_id)
+        except Exception as e:
+            logger.error("Failed to record message for suggestion %s: %s", suggestion_id, e)
+    
+    async def _lookup_suggestion(
+        self, 
+        channel: Optional[str], 
+        message_ts: Optional[str]
+    ) -> Optional[str]:
+        """
+        Find the suggestion sent in a message.
+        
+        Recent messages are answered from the in-memory map. Others fall
+        back to the DB, so suggestions sent before a restart or by another
+        worker still resolve.
+        """
+        suggestion_id = self._suggestion_message_map.get(message_ts)
+        if suggestion_id:
+            self._suggestion_message_map.move_to_end(message_ts)
+            return suggestion_id
+        
+        if not channel or not message_ts:
+            return None
+        
+        try:
+            suggestion_id = await self.db.get_suggestion_id_for_message(channel, message_ts)
+        except Exception as e:
+            logger.error("Failed to look up suggestion for message %s: %s", message_ts, e)
+            return None
+        
+        if suggestion_id:
+            self._remember_suggestion(message_ts, suggestion_id)
+        return suggestion_id
+    
+    def _remember_suggestion(self, message_ts: str, suggestion_id: str) -> None:
+        """Map a message to its suggestion, evicting the least recently used."""
+        suggestion_map = self._suggestion_message_map
+        suggestion_map[message_ts] = suggestion_id
+        suggestion_map.move_to_end(message_ts)
+        if len(suggestion_map) > _SUGGESTION_MAP_MAX:
+            suggestion_map.popitem(last=False)
     
     async def send_dm_suggestion(
         self,
@@ -356,22 +692,43 @@ class SlackBot:
     ):
         """Send a suggestion via DM to the founder."""
         try:
-            # Open DM channel
-            result = await client.conversations_open(users=[user_id])
-            channel = result["channel"]["id"]
-            
-            await self.send_suggestion(
-                channel=channel,
-                insight=content.core_insight,
-                why_it_works=content.why_it_works,
-                linkedin_draft=content.linkedin_draft,
-                x_draft=content.x_draft,
-                suggestion_id=suggestion_id,
-                client=client
-            )
-            
+            channel = await self.open_dm_channel(user_id, client)
+            await self.send_content(channel, content, suggestion_id, client)
         except Exception as e:
-            logger.error(f"Failed to send DM suggestion: {e}")
+            logger.error("Failed to send DM suggestion: %s", e)
+    
+    async def open_dm_channel(self, user_id: str, client) -> str:
+        """Open (or reuse) the DM channel with a user and return its ID."""
+        cache = self._dm_channel_cache
+        channel = cache.get(user_id)
+        if channel is not None:
+            cache.move_to_end(user_id)
+            return channel
+        
+        result = await client.conversations_open(users=[user_id])
+        channel = result["channel"]["id"]
+        cache[user_id] = channel
+        if len(cache) > _DM_CHANNEL_CACHE_MAX:
+            cache.popitem(last=False)
+        return channel
+    
+    async def send_content(
+        self,
+        channel: str,
+        content: GeneratedContent,
+        suggestion_id: str,
+        client
+    ):
+        """Send generated content as a suggestion message to a channel."""
+        await self.send_suggestion(
+            channel=channel,
+            insight=content.core_insight,
+            why_it_works=content.why_it_works,
+            linkedin_draft=content.linkedin_draft,
+            x_draft=content.x_draft,
+            suggestion_id=suggestion_id,
+            client=client
+        )
     
     def _format_suggestion_message(
         self,
@@ -381,26 +738,12 @@ class SlackBot:
         x_draft: str
     ) -> str:
         """Format the suggestion message per PRD template."""
-        return f"""👀 This might be worth posting:
-
-*INSIGHT:*
-{insight}
-
-*Why this works:*
-{why_it_works}
-
-*LinkedIn Draft:*
----
-{linkedin_draft}
----
-
-*X Draft:*
----
-{x_draft}
----
-
-React with:
-👍 Save   🔁 Rewrite   ❌ Ignore"""
+        return _SUGGESTION_TMPL.format(
+            insight=insight,
+            why_it_works=why_it_works,
+            linkedin_draft=linkedin_draft,
+            x_draft=x_draft
+        )
     
     def get_app(self) -> AsyncApp:
         """Get the Slack Bolt app instance."""
@@ -409,10 +752,18 @@ React with:
 
 # Singleton instance
 _slack_bot: Optional[SlackBot] = None
+_slack_bot_lock = threading.Lock()
 
 def get_slack_bot() -> SlackBot:
-    """Get Slack bot singleton."""
+    """
+    Get Slack bot singleton.
+    
+    Construction is locked so concurrent first calls can't build two
+    bots with split reaction state.
+    """
     global _slack_bot
     if _slack_bot is None:
-        _slack_bot = SlackBot()
+        with _slack_bot_lock:
+            if _slack_bot is None:
+                _slack_bot = SlackBot()
     return _slack_bot
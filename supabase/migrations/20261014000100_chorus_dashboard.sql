@@ -0,0 +1,50 @@
+-- Aggregated counts for /health and /api/debug in a single round trip.
+
+create or replace function chorus_dashboard(window_minutes int default 60)
+returns json
+language sql
+stable
+as $$
+  select json_build_object(
+    'listening_channels_count', (select count(*) from listening_channels),
+    'suggestions_today_count', (
+      select count(*)
+      from suggestions
+      where created_at >= date_trunc('day', now() at time zone 'utc') at time zone 'utc'
+    ),
+    'channels', coalesce((
+      select json_agg(
+        json_build_object(
+          'channel_id', lc.channel_id,
+          'message_count', counts.message_count,
+          'recent_messages', recent.messages
+        )
+        order by lc.channel_id
+      )
+      from listening_channels lc
+      cross join lateral (
+        select count(*) as message_count
+        from messages m
+        where m.channel_id = lc.channel_id
+          and m.created_at >= now() - make_interval(mins => window_minutes)
+      ) counts
+      cross join lateral (
+        select coalesce(
+          json_agg(
+            json_build_object('user_id', r.user_id, 'text', r.text)
+            order by r.created_at
+          ),
+          '[]'::json
+        ) as messages
+        from (
+          select m.user_id, m.text, m.created_at
+          from messages m
+          where m.channel_id = lc.channel_id
+            and m.created_at >= now() - make_interval(mins => window_minutes)
+          order by m.created_at desc
+          limit 5
+        ) r
+      ) recent
+    ), '[]'::json)
+  );
+$$;
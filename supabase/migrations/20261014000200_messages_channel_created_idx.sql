@@ -0,0 +1,4 @@
+-- Serves per-channel window reads (newest first) without a sort step.
+
+create index if not exists messages_channel_created_idx
+  on messages (channel_id, created_at desc);
@@ -0,0 +1,23 @@
+-- Rolling message window with the cutoff computed from the database clock.
+-- Returns the newest max_rows messages in the window, oldest first.
+
+create or replace function get_messages_window(
+  channel_id text,
+  minutes int,
+  max_rows int default 500
+)
+returns setof messages
+language sql
+stable
+as $$
+  select *
+  from (
+    select m.*
+    from messages m
+    where m.channel_id = get_messages_window.channel_id
+      and m.created_at >= now() - make_interval(mins => minutes)
+    order by m.created_at desc
+    limit max_rows
+  ) recent
+  order by recent.created_at;
+$$;
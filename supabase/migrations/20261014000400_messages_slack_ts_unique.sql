@@ -0,0 +1,6 @@
+-- Slack redelivers events on socket reconnects; dedupe them at insert time.
+
+alter table messages add column if not exists slack_ts text;
+
+create unique index if not exists messages_channel_slack_ts_key
+  on messages (channel_id, slack_ts);
@@ -0,0 +1,21 @@
+-- Buffers for every listening channel that has at least min_messages in
+-- the rolling window, in one pass. Rows are ordered by channel, then time.
+
+create or replace function get_ready_buffers(
+  min_messages int,
+  window_minutes int default 60
+)
+returns setof messages
+language sql
+stable
+as $$
+  select (recent.m).*
+  from (
+    select m, count(*) over (partition by m.channel_id) as msg_cnt
+    from messages m
+    where m.created_at >= now() - make_interval(mins => window_minutes)
+      and m.channel_id in (select channel_id from listening_channels)
+  ) recent
+  where recent.msg_cnt >= min_messages
+  order by (recent.m).channel_id, (recent.m).created_at;
+$$;
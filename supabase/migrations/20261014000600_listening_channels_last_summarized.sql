@@ -0,0 +1,39 @@
+-- Per-channel high-water mark so unprocessed-message reads are a bounded
+-- range scan on messages (channel_id, created_at).
+
+alter table listening_channels
+  add column if not exists last_summarized_at timestamptz;
+
+-- Advance the mark in the same transaction that inserts the summary.
+create or replace function mark_channel_summarized()
+returns trigger
+language plpgsql
+as $$
+begin
+  update listening_channels
+     set last_summarized_at = greatest(
+       coalesce(last_summarized_at, '-infinity'),
+       coalesce((new.metadata->>'window_end')::timestamptz, new.created_at)
+     )
+   where channel_id = new.channel_id;
+  return new;
+end;
+$$;
+
+drop trigger if exists summaries_mark_channel_summarized on summaries;
+create trigger summaries_mark_channel_summarized
+  after insert on summaries
+  for each row execute function mark_channel_summarized();
+
+create or replace function get_new_messages(channel_id text)
+returns setof messages
+language sql
+stable
+as $$
+  select m.*
+  from messages m
+  join listening_channels lc on lc.channel_id = m.channel_id
+  where m.channel_id = get_new_messages.channel_id
+    and m.created_at > coalesce(lc.last_summarized_at, '-infinity')
+  order by m.created_at;
+$$;
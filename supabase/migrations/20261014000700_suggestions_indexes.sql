@@ -0,0 +1,9 @@
+-- get_saved_suggestions: status = 'saved' ordered by created_at desc.
+-- The saved subset is small, so a partial index stays tiny.
+create index if not exists suggestions_saved_idx
+  on suggestions (created_at desc)
+  where status = 'saved';
+
+-- get_suggestions_today / count_suggestions_today: created_at range.
+create index if not exists suggestions_today_idx
+  on suggestions (created_at desc);
@@ -0,0 +1,13 @@
+-- Suggestions created since midnight UTC, with the day boundary computed
+-- by the database so it is consistent and can use suggestions_today_idx.
+
+create or replace function get_suggestions_today()
+returns setof suggestions
+language sql
+stable
+as $$
+  select *
+  from suggestions
+  where created_at >= date_trunc('day', now() at time zone 'utc') at time zone 'utc'
+  order by created_at desc;
+$$;
@@ -0,0 +1,14 @@
+-- Normalized-insight fingerprint for the cheap duplicate pre-filter.
+-- Must match insight_fingerprint() in app/services/detector.py:
+-- sha1 of the lowercased insight with non-word runs collapsed to a space.
+alter table suggestions add column if not exists fingerprint text;
+
+update suggestions
+set fingerprint = encode(
+  extensions.digest(btrim(regexp_replace(lower(insight), '\W+', ' ', 'g')), 'sha1'),
+  'hex'
+)
+where fingerprint is null;
+
+create index if not exists suggestions_fingerprint_idx
+  on suggestions (fingerprint);
@@ -0,0 +1,17 @@
+-- Number of messages in a channel's rolling window, for threshold checks
+-- that don't need the rows. Same cutoff as get_messages_window(), and
+-- served by messages_channel_created_idx.
+
+create or replace function count_messages_window(
+  channel_id text,
+  minutes int
+)
+returns int
+language sql
+stable
+as $$
+  select count(*)::int
+  from messages m
+  where m.channel_id = count_messages_window.channel_id
+    and m.created_at >= now() - make_interval(mins => minutes);
+$$;
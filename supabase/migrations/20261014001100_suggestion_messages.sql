@@ -0,0 +1,10 @@
+-- Slack messages a suggestion was sent in, so reactions still resolve
+-- after a restart and any worker can handle them.
+
+create table if not exists suggestion_messages (
+  channel_id text not null,
+  message_ts text not null,
+  suggestion_id uuid not null references suggestions (id) on delete cascade,
+  created_at timestamptz not null default now(),
+  primary key (channel_id, message_ts)
+);
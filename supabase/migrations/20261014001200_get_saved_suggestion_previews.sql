@@ -0,0 +1,18 @@
+-- Latest saved suggestions with the insight cut to a preview, so the
+-- "saved posts" reply doesn't transfer full insight text. Served by
+-- suggestions_saved_idx.
+
+create or replace function get_saved_suggestion_previews(
+  max_rows int,
+  preview_chars int
+)
+returns table (id uuid, insight text, created_at timestamptz)
+language sql
+stable
+as $$
+  select s.id, left(s.insight, preview_chars), s.created_at
+  from suggestions s
+  where s.status = 'saved'
+  order by s.created_at desc
+  limit max_rows;
+$$;
@@ -0,0 +1,30 @@
+-- Cap get_ready_buffers() at the newest max_rows messages per channel,
+-- matching get_messages_window(), so one busy channel can't return an
+-- unbounded result. Rows stay ordered by channel, then oldest first.
+
+drop function if exists get_ready_buffers(int, int);
+
+create or replace function get_ready_buffers(
+  min_messages int,
+  window_minutes int default 60,
+  max_rows int default 500
+)
+returns setof messages
+language sql
+stable
+as $$
+  select (recent.m).*
+  from (
+    select m,
+           count(*) over (partition by m.channel_id) as msg_cnt,
+           row_number() over (
+             partition by m.channel_id order by m.created_at desc
+           ) as rn
+    from messages m
+    where m.created_at >= now() - make_interval(mins => window_minutes)
+      and m.channel_id in (select channel_id from listening_channels)
+  ) recent
+  where recent.msg_cnt >= min_messages
+    and recent.rn <= max_rows
+  order by (recent.m).channel_id, (recent.m).created_at;
+$$;
@@ -0,0 +1,77 @@
+-- Start the pipeline's window reads from each channel's last_summarized_at
+-- mark, so messages already summarized inside the rolling window aren't
+-- summarized again on the next (or a manually triggered) run. Channels
+-- without a mark read the whole window as before.
+
+create or replace function get_messages_window(
+  channel_id text,
+  minutes int,
+  max_rows int default 500
+)
+returns setof messages
+language sql
+stable
+as $$
+  select *
+  from (
+    select m.*
+    from messages m
+    where m.channel_id = get_messages_window.channel_id
+      and m.created_at >= now() - make_interval(mins => minutes)
+      and m.created_at > coalesce(
+        (select lc.last_summarized_at
+           from listening_channels lc
+          where lc.channel_id = get_messages_window.channel_id),
+        '-infinity'
+      )
+    order by m.created_at desc
+    limit max_rows
+  ) recent
+  order by recent.created_at;
+$$;
+
+create or replace function count_messages_window(
+  channel_id text,
+  minutes int
+)
+returns int
+language sql
+stable
+as $$
+  select count(*)::int
+  from messages m
+  where m.channel_id = count_messages_window.channel_id
+    and m.created_at >= now() - make_interval(mins => minutes)
+    and m.created_at > coalesce(
+      (select lc.last_summarized_at
+         from listening_channels lc
+        where lc.channel_id = count_messages_window.channel_id),
+      '-infinity'
+    );
+$$;
+
+create or replace function get_ready_buffers(
+  min_messages int,
+  window_minutes int default 60,
+  max_rows int default 500
+)
+returns setof messages
+language sql
+stable
+as $$
+  select (recent.m).*
+  from (
+    select m,
+           count(*) over (partition by m.channel_id) as msg_cnt,
+           row_number() over (
+             partition by m.channel_id order by m.created_at desc
+           ) as rn
+    from messages m
+    join listening_channels lc on lc.channel_id = m.channel_id
+    where m.created_at >= now() - make_interval(mins => window_minutes)
+      and m.created_at > coalesce(lc.last_summarized_at, '-infinity')
+  ) recent
+  where recent.msg_cnt >= min_messages
+    and recent.rn <= max_rows
+  order by (recent.m).channel_id, (recent.m).created_at;
+$$;